@@ -1,26 +1,223 @@
 # banking system app
+#
+#   python banking-system.py                        # interactive menu
+#   python banking-system.py --script commands.txt  # or: ... | python banking-system.py --script
+#   python banking-system.py --serve --port 8765    # one account per TCP session
+#   python banking-system.py --load --sessions 200 --commands 500 --port 8765
+#
+# Scripted and network commands are one per line: "1" / "check", "2 100" / "deposit 100",
+# "3 50" / "withdraw 50", "4" / "quit". Every command gets exactly one reply line.
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+COMMANDS = {"1": 1, "check": 1, "2": 2, "deposit": 2, "3": 3, "withdraw": 3, "4": 4, "quit": 4}
+GOODBYE = "Thank you for using ur banking system"
+
 
 def menu():
     print("--- Banking System ---")
     print("1. Check Balance\n2. Deposit\n3. Withdraw\n4. Quit")
 
 
-balance = 0
-
-while True:
-    menu()
-    choice = int(input("Enter your choice: "))
-    if choice == 1:
-        print("Balance: ", balance)
-    elif choice == 2:
-        amount = int(input("Enter the amount to deposit: "))
-        balance += amount
-    elif choice == 3:
-        amount = int(input("Enter the amount to withdraw: "))
-        if balance >= amount:
-            balance -= amount
+class Session:
+    """One customer's account; every mode drives the same rules through execute()."""
+
+    def __init__(self):
+        self.balance = 0
+        self.done = False
+
+    def execute(self, choice, amount=None):
+        if choice == 1:
+            return f"Balance: {self.balance}"
+        if choice == 4:
+            self.done = True
+            return GOODBYE
+        if choice not in (2, 3):
+            return "Invalid choice"
+        if amount is None or amount <= 0:
+            return "Invalid amount"
+        if choice == 2:
+            self.balance += amount
+            return f"Deposited {amount}. Balance: {self.balance}"
+        if self.balance >= amount:
+            self.balance -= amount
+            return f"Withdrew {amount}. Balance: {self.balance}"
+        return "Insufficient funds"
+
+    def run_line(self, line):
+        """Execute one scripted command; returns None for blank lines and comments."""
+        words = line.split("#", 1)[0].split()
+        if not words:
+            return None
+        choice = COMMANDS.get(words[0].lower())
+        try:
+            amount = int(words[1]) if len(words) > 1 else None
+        except ValueError:
+            return "Invalid amount"
+        return self.execute(choice, amount)
+
+
+def interactive():
+    session = Session()
+    while not session.done:
+        menu()
+        try:
+            choice = int(input("Enter your choice: "))
+        except ValueError:
+            print("Invalid choice")
+            continue
+        amount = None
+        if choice in (2, 3):
+            verb = "deposit" if choice == 2 else "withdraw"
+            try:
+                amount = int(input(f"Enter the amount to {verb}: "))
+            except ValueError:
+                print("Invalid amount")
+                continue
+        print(session.execute(choice, amount))
+
+
+def run_script(stream, out=sys.stdout, chunk_lines=10_000):
+    """Run commands from a file or pipe without prompts; returns (commands, seconds)."""
+    session = Session()
+    started = time.perf_counter()
+    commands = 0
+    replies = []
+    for line in stream:
+        reply = session.run_line(line)
+        if reply is None:
+            continue
+        commands += 1
+        replies.append(reply)
+        if len(replies) >= chunk_lines:
+            out.write("\n".join(replies) + "\n")
+            replies = []
+        if session.done:
+            break
+    if replies:
+        out.write("\n".join(replies) + "\n")
+    return commands, time.perf_counter() - started
+
+
+async def handle_session(reader, writer):
+    session = Session()
+    try:
+        while not session.done:
+            line = await reader.readline()
+            if not line:
+                break
+            reply = session.run_line(line.decode(errors="replace"))
+            if reply is not None:
+                writer.write((reply + "\n").encode())
+                await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8765):
+    """Start the server; each connection is its own session with its own balance."""
+    return await asyncio.start_server(handle_session, host, port)
+
+
+async def run_load(host, port, sessions, commands, seed=42):
+    """Drive many concurrent sessions; returns (latencies in seconds, wrong replies, seconds)."""
+    latencies, wrong = [], 0
+
+    async def client(n):
+        nonlocal wrong
+        rng = random.Random(seed + n)
+        reader, writer = await asyncio.open_connection(host, port)
+        balance = 0  # what this session's balance must be if no other session touches it
+        for _ in range(commands):
+            choice, amount = rng.choice((1, 2, 3)), rng.randint(1, 500)
+            line = "1" if choice == 1 else f"{choice} {amount}"
+            started = time.perf_counter()
+            writer.write((line + "\n").encode())
+            await writer.drain()
+            reply = (await reader.readline()).decode().strip()
+            latencies.append(time.perf_counter() - started)
+            if choice == 2:
+                balance += amount
+            elif choice == 3 and balance >= amount:
+                balance -= amount
+            elif choice == 3:
+                wrong += reply != "Insufficient funds"
+                continue
+            wrong += not reply.endswith(f"Balance: {balance}")
+        writer.write(b"4\n")
+        await reader.readline()
+        writer.close()
+        await writer.wait_closed()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(sessions)))
+    return latencies, wrong, time.perf_counter() - started
+
+
+async def load_main(args):
+    server = await serve(args.host, 0) if args.local else None
+    port = server.sockets[0].getsockname()[1] if server else args.port
+    latencies, wrong, elapsed = await run_load(args.host, port, args.sessions, args.commands, args.seed)
+    if server:
+        server.close()
+        await server.wait_closed()
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+    print(f"{args.sessions} sessions x {args.commands} commands: {len(latencies) / elapsed:.0f} commands/sec, "
+          f"p50 {pct(50):.2f} ms, p95 {pct(95):.2f} ms, p99 {pct(99):.2f} ms, max {latencies[-1] * 1000:.2f} ms, "
+          f"{wrong} wrong replies")
+    return wrong
+
+
+async def serve_main(args):
+    server = await serve(args.host, args.port)
+    print(f"Banking server listening on {args.host}:{server.sockets[0].getsockname()[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simple banking system.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--script", nargs="?", const="-", metavar="FILE",
+                      help="run commands from FILE (or stdin) without prompts")
+    mode.add_argument("--serve", action="store_true", help="serve sessions over TCP")
+    mode.add_argument("--load", action="store_true", help="run the load generator against a server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--local", action="store_true", help="with --load, start a server in-process")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--commands", type=int, default=1000, help="commands per session")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.script:
+        if args.script == "-":
+            commands, seconds = run_script(sys.stdin)
         else:
-            print("Insufficient funds")
-    elif choice == 4:
-        print("Thank you for using ur banking system")
-        break
+            with open(args.script) as f:
+                commands, seconds = run_script(f)
+        print(f"{commands} commands in {seconds:.2f}s ({commands / seconds if seconds else 0:.0f} commands/sec)",
+              file=sys.stderr)
+    elif args.serve:
+        try:
+            asyncio.run(serve_main(args))
+        except KeyboardInterrupt:
+            pass
+    elif args.load:
+        sys.exit(1 if asyncio.run(load_main(args)) else 0)
+    else:
+        interactive()
+
+
+if __name__ == "__main__":
+    main()
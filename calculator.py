@@ -1,4 +1,28 @@
 # calculator App with menu option selection
+#
+#   python calculator.py                                   # interactive menu
+#   python calculator.py batch mul pairs.csv -o out.txt    # one "a,b" pair per line (header optional)
+#   python calculator.py batch pow pairs.bin --binary      # little-endian int64 pairs
+#   python calculator.py bench add --rows 1000000          # batch engine vs the per-row path
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+from array import array
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # batches then run row by row
+    np = None
+
+CHUNK_ROWS = 100_000  # operand pairs read, computed and written at a time
+POWER_LIMIT_BITS = 100_000  # refuse powers whose result would be larger than this
+UNDEFINED = "undefined"
+INVALID = "invalid"
 
 def add(a, b):
     return a + b
@@ -12,27 +36,210 @@ def mul(a, b):
     return a * b
 
 
+def div(a, b):
+    return a / b
+
+
+def power(a, b):
+    return a ** b
+
+
+OPERATIONS = {"add": add, "sub": sub, "mul": mul, "div": div, "pow": power}
+
+
+def apply(op, a, b):
+    """One row, exactly, with Python ints; the reference the batch engine must agree with."""
+    if op == "pow" and b > 0 and abs(a) > 1 and b * math.log2(abs(a)) > POWER_LIMIT_BITS:
+        return UNDEFINED
+    try:
+        return OPERATIONS[op](a, b)
+    except (ZeroDivisionError, OverflowError):
+        return UNDEFINED
+
+
+def _vectorized(op, a, b):
+    # int64 arithmetic on whole columns; rows that could overflow (or need Python's exact
+    # semantics) are flagged and recomputed with apply()
+    with np.errstate(all="ignore"):
+        if op == "add":
+            result = a + b
+            slow = ((a ^ result) & (b ^ result)) < 0
+        elif op == "sub":
+            result = a - b
+            slow = ((a ^ b) & (a ^ result)) < 0
+        elif op == "mul":
+            result = a * b
+            slow = np.abs(a.astype(np.float64) * b) >= 2.0 ** 62
+        elif op == "div":
+            # int64 -> float64 is exact below 2**53 (2**53 + 1 rounds down to it, so >= is needed);
+            # beyond that Python divides the ints exactly
+            exact = 2.0 ** 53
+            slow = (b == 0) | (np.abs(a.astype(np.float64)) >= exact) | (np.abs(b.astype(np.float64)) >= exact)
+            result = a / np.where(slow, 1, b)
+        else:
+            magnitude = np.abs(a.astype(np.float64))
+            slow = (b < 0) | ((magnitude > 1) & (b * np.log2(np.maximum(magnitude, 1)) >= 62))
+            result = np.power(a, np.where(slow, 0, b))
+    results = result.tolist()
+    for i in np.flatnonzero(slow).tolist():
+        results[i] = apply(op, int(a[i]), int(b[i]))
+    return results
+
+
+def _parse_rows(lines):
+    # Python ints of any size; a row that does not parse yields (None, None)
+    pairs = []
+    for line in lines:
+        try:
+            a, b = line.split(",")
+            pairs.append((int(a), int(b)))
+        except ValueError:
+            pairs.append((None, None))
+    return pairs
+
+
+def _is_header(line):
+    # Column names, such as "a,b"; any other first line is data, and "invalid" if it does not parse
+    fields = line.split(",")
+    return len(fields) == 2 and all(field.strip().isidentifier() for field in fields)
+
+
+def _csv_chunks(f, chunk_rows, vectorize):
+    first = f.readline()
+    pending = [] if _is_header(first) else [first]
+    while True:
+        lines = pending + list(islice(f, chunk_rows - len(pending)))
+        pending = []
+        if not lines:
+            return
+        lines = [line for line in lines if line and not line.isspace()]  # blank lines give no result
+        if not lines:
+            continue
+        if vectorize:
+            try:
+                # comments=None: a "#" is not a comment here, and gives "invalid" like any other junk
+                columns = np.loadtxt(lines, delimiter=",", dtype=np.int64, ndmin=2, comments=None)
+                yield columns[:, 0], columns[:, 1]
+                continue
+            except (ValueError, OverflowError):
+                pass  # operands beyond int64 or malformed rows: this chunk goes row by row
+        yield _parse_rows(lines)
+
+
+def _binary_chunks(f, chunk_rows, vectorize):
+    while True:
+        data = f.read(chunk_rows * 16)
+        if not data:
+            return
+        data = data[:len(data) // 16 * 16]
+        if vectorize:
+            columns = np.frombuffer(data, dtype="<i8").reshape(-1, 2)
+            yield columns[:, 0], columns[:, 1]
+        else:
+            values = array("q")
+            values.frombytes(data)
+            if sys.byteorder == "big":
+                values.byteswap()
+            yield list(zip(values[0::2], values[1::2]))
+
+
+def run_batch(op, source, out, binary=False, chunk_rows=CHUNK_ROWS, per_row=False):
+    """Stream operand pairs from the file `source` and write one result per line to `out`.
+
+    Returns (rows, seconds). Rows that do not parse give "invalid"; division by zero and powers
+    too large to hold give "undefined".
+    """
+    if op not in OPERATIONS:
+        raise ValueError(f"Unknown operation {op!r}; choose from {', '.join(OPERATIONS)}")
+    vectorize = not per_row and np is not None
+    started = time.perf_counter()
+    rows = 0
+    with open(source, "rb" if binary else "r") as f:
+        chunks = (_binary_chunks if binary else _csv_chunks)(f, chunk_rows, vectorize)
+        for chunk in chunks:
+            if isinstance(chunk, tuple):
+                results = _vectorized(op, *chunk)
+            else:
+                results = [INVALID if a is None else apply(op, a, b) for a, b in chunk]
+            out.write("\n".join(map(str, results)) + "\n")
+            rows += len(results)
+    return rows, time.perf_counter() - started
+
+
+def bench(op, rows, seed=42):
+    """Run the same file through the batch engine and the per-row path; outputs must match."""
+    import random
+    rng = random.Random(seed)
+    # Operands mostly within int64 results, so the numbers show the vectorized path
+    low, high = {"pow": (-20, 60), "mul": (-3 * 10 ** 9, 3 * 10 ** 9)}.get(op, (-10 ** 12, 10 ** 12))
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, "pairs.csv")
+        with open(source, "w") as f:
+            f.write("a,b\n")
+            for _ in range(rows):
+                f.write(f"{rng.randint(low, high)},{rng.randint(-3 if op == 'pow' else low, high)}\n")
+        timings = {}
+        for name, per_row in (("batch", False), ("per-row", True)):
+            with open(os.path.join(workdir, f"{name}.txt"), "w") as out:
+                timings[name] = run_batch(op, source, out, per_row=per_row)[1]
+        with open(os.path.join(workdir, "batch.txt")) as a, open(os.path.join(workdir, "per-row.txt")) as b:
+            same = a.read() == b.read()
+    engine = "NumPy" if np is not None else "pure Python"
+    print(f"{op} x {rows} rows: batch ({engine}) {rows / timings['batch']:.0f} rows/sec, "
+          f"per-row {rows / timings['per-row']:.0f} rows/sec, "
+          f"{timings['per-row'] / timings['batch']:.1f}x, outputs {'match' if same else 'DIFFER'}")
+    return same
+
+
 def display_menu():
     print("### Simple Calculator ###")
-    print("1. Add\n2. Subtract\n3. Multiply\n4. Quit")
-
-
-while True:
-    display_menu()
-    choice = int(input("Enter your choice: "))
-    if choice in {1, 2, 3}:
-        a = int(input("Enter first number: "))
-        b = int(input("Enter second number: "))
-
-    if choice == 1:
-        print("Result: ", add(a, b))
-    elif choice == 2:
-        print("Result: ", sub(a, b))
-    elif choice == 3:
-        print("Result: ", mul(a, b))
-    elif choice == 4:
-        print("Quitting...")
-        break
+    print("1. Add\n2. Subtract\n3. Multiply\n4. Divide\n5. Power\n6. Quit")
+
+
+def interactive():
+    names = {1: "add", 2: "sub", 3: "mul", 4: "div", 5: "pow"}
+    while True:
+        display_menu()
+        choice = int(input("Enter your choice: "))
+        if choice in names:
+            a = int(input("Enter first number: "))
+            b = int(input("Enter second number: "))
+            print("Result: ", apply(names[choice], a, b))
+        elif choice == 6:
+            print("Quitting...")
+            break
+        else:
+            print("Invalid choice. Try again")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simple calculator.")
+    commands = parser.add_subparsers(dest="command")
+    batch = commands.add_parser("batch", help="apply one operation to a file of operand pairs")
+    batch.add_argument("op", choices=OPERATIONS)
+    batch.add_argument("input")
+    batch.add_argument("-o", "--output", help="results file (default: stdout)")
+    batch.add_argument("--binary", action="store_true", help="input is little-endian int64 pairs")
+    batch.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    batch.add_argument("--per-row", action="store_true", help="skip vectorization (for comparison)")
+    bench_parser = commands.add_parser("bench", help="compare the batch engine with the per-row path")
+    bench_parser.add_argument("op", choices=OPERATIONS)
+    bench_parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.command == "batch":
+        out = open(args.output, "w") if args.output else sys.stdout
+        try:
+            rows, seconds = run_batch(args.op, args.input, out, args.binary, args.chunk_rows, args.per_row)
+        finally:
+            if args.output:
+                out.close()
+        print(f"{rows} rows in {seconds:.2f}s ({rows / seconds if seconds else 0:.0f} rows/sec)", file=sys.stderr)
+    elif args.command == "bench":
+        sys.exit(0 if bench(args.op, args.rows) else 1)
     else:
-        print("Invalid choice. Try again")
+        interactive()
+
 
+if __name__ == "__main__":
+    main()
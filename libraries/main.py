@@ -1,9 +1,127 @@
-from currency_converter import CurrencyConverter
+# USD -> INR conversion
+#
+#   python main.py              # rates from the pre-parsed cache (see rates.py), built on first run
+#   python main.py --no-cache   # let CurrencyConverter parse its rate file as before
+#   python main.py --startup    # time a cold start of each, in fresh interpreters
+#   python main.py batch conversions.csv -o out.txt   # "amount,from,to,date" rows (header optional)
+#   python main.py bench --rows 1000000               # rows/sec and memory, spot-checked row by row
 
-c = CurrencyConverter()
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import date
 
-amount = float(input("Enter the amount in USD: "))
 
-new_amount = c.convert(amount, 'USD', 'INR')
+def converter(use_cache):
+    if use_cache:
+        from rates import RateTable
+        return RateTable.load()
+    from currency_converter import CurrencyConverter
+    return CurrencyConverter()
 
-print(f"The amount you entered is: {new_amount}")
+
+def startup(runs=10):
+    """Median time for a new interpreter to import, load the rates and convert one amount."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = ("import time; t = time.perf_counter(); import main; "
+            "main.converter({}).convert(100, 'USD', 'INR'); print(time.perf_counter() - t)")
+    subprocess.run([sys.executable, "-c", code.format(True)], cwd=here, check=True, capture_output=True)  # warm the cache
+    for name, use_cache in (("cached table", True), ("CurrencyConverter", False)):
+        times = [float(subprocess.run([sys.executable, "-c", code.format(use_cache)], cwd=here, check=True,
+                                      capture_output=True, text=True).stdout) for _ in range(runs)]
+        print(f"{name:<18} {statistics.median(times) * 1000:8.1f} ms (median of {runs})")
+
+
+def peak_memory():
+    """Peak resident set size of this process, in MB (None where the resource module is missing)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10  # bytes on macOS, KB elsewhere
+
+
+def summary(rows, seconds):
+    peak = peak_memory()
+    return (f"{rows} rows in {seconds:.2f}s ({rows / seconds if seconds else 0:.0f} rows/sec)"
+            + (f", peak memory {peak:.0f} MB" if peak else ""))
+
+
+def bench(rows, samples=1000, seed=42):
+    """Convert a random file, then spot-check `samples` of its results against convert_line()."""
+    from rates import RateTable, convert_file, convert_line
+    table = RateTable.load()
+    rng = random.Random(seed)
+    codes = table.currencies + ["EUR"]
+    first = table.first_day
+    checked = set(rng.sample(range(rows), min(samples, rows)))
+    with tempfile.TemporaryDirectory() as workdir:
+        source, output = os.path.join(workdir, "conversions.csv"), os.path.join(workdir, "converted.txt")
+        with open(source, "w") as f:
+            f.write("amount,from,to,date\n")
+            for _ in range(rows):
+                # weekends, blank dates, the odd bad code and rows missing a field or with one too
+                # many exercise the "no rate" and fallback rows
+                day = "" if rng.random() < 0.01 else date.fromordinal(first + rng.randrange(table.days)).isoformat()
+                target = "XXX" if rng.random() < 0.001 else rng.choice(codes)
+                row = f"{rng.uniform(0, 10 ** 6):.2f},{rng.choice(codes)},{target},{day}"
+                if rng.random() < 0.001:
+                    row = row.rsplit(",", 1)[0] if rng.random() < 0.5 else f"{row},{day}"
+                f.write(row + "\n")
+        with open(output, "w") as out:
+            _, seconds = convert_file(source, out, table)
+        wrong = 0
+        with open(source) as f, open(output) as results:
+            next(f)  # header
+            for n, (line, result) in enumerate(zip(f, results)):
+                wrong += n in checked and result.rstrip("\n") != str(convert_line(table, line))
+    print(f"{summary(rows, seconds)}; {len(checked) - wrong} of {len(checked)} sampled rows match convert_line()")
+    return wrong == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert an amount from USD to INR.")
+    parser.add_argument("--no-cache", action="store_true", help="parse the rate file with CurrencyConverter")
+    parser.add_argument("--startup", action="store_true", help="measure cold-start time, cached vs not")
+    commands = parser.add_subparsers(dest="command")
+    batch = commands.add_parser("batch", help="convert a CSV of amount,from,to,date rows")
+    batch.add_argument("input")
+    batch.add_argument("-o", "--output", help="results file, one per input row (default: stdout)")
+    batch.add_argument("--chunk-rows", type=int, default=100_000)
+    batch.add_argument("--per-row", action="store_true", help="skip vectorization (for comparison)")
+    bench_parser = commands.add_parser("bench", help="time a random file and spot-check the results")
+    bench_parser.add_argument("--rows", type=int, default=1_000_000)
+    bench_parser.add_argument("--samples", type=int, default=1000, help="rows checked one by one")
+    args = parser.parse_args()
+
+    if args.command == "batch":
+        from rates import convert_file
+        out = open(args.output, "w") if args.output else sys.stdout
+        try:
+            rows, seconds = convert_file(args.input, out, chunk_rows=args.chunk_rows, per_row=args.per_row)
+        finally:
+            if args.output:
+                out.close()
+        print(summary(rows, seconds), file=sys.stderr)
+        return
+    if args.command == "bench":
+        sys.exit(0 if bench(args.rows, args.samples) else 1)
+    if args.startup:
+        startup()
+        return
+    c = converter(not args.no_cache)
+
+    amount = float(input("Enter the amount in USD: "))
+
+    new_amount = c.convert(amount, 'USD', 'INR')
+
+    print(f"The amount you entered is: {new_amount}")
+
+
+if __name__ == "__main__":
+    main()
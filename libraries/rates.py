@@ -0,0 +1,341 @@
+# Pre-parsed exchange rate table for main.py
+# CurrencyConverter() re-parses the ECB history zip it ships with (~25 years x ~40 currencies) on
+# every run. RateTable parses it once into a dense day x currency table of EUR rates, caches that
+# as a flat binary file and memory-maps it on later runs. Nothing here touches the network.
+# convert_file() streams whole CSVs of conversions through the same table, vectorized with NumPy
+# when it is installed.
+
+import hashlib
+import importlib.util
+import io
+import math
+import mmap
+import os
+import struct
+import sys
+import zipfile
+import time
+import zlib
+from array import array
+from datetime import date, datetime
+from itertools import islice, repeat
+
+REF_CURRENCY = "EUR"
+NA_VALUES = frozenset(["", "N/A"])
+CHUNK_ROWS = 100_000  # rows read, converted and written at a time by convert_file()
+INVALID = "invalid"
+NO_RATE = "no rate"
+
+# Cache layout (little-endian):
+#   header  magic, version, reserved, crc32 of everything after the header, day count, currency
+#           count, length of the code list, first day (proleptic ordinal), then the source's size,
+#           mtime and sha256
+#   ascii   comma-separated currency codes
+#   int32   first and last day index with a rate, per currency
+#   float64 rates, one row per day (missing rates are NaN)
+CACHE_MAGIC = b"FXRT"
+CACHE_VERSION = 1
+_CACHE_HEADER = struct.Struct("<4sHHIIIIIQQ32s")
+
+
+np = None
+
+
+class RateNotFoundError(Exception):
+    pass
+
+
+def _numpy():
+    # Importing NumPy would more than double main.py's cold start, so only the batch path does,
+    # when it first runs; None if it is not installed
+    global np
+    if np is None:
+        try:
+            import numpy as np
+        except ImportError:
+            pass
+    return np
+
+
+def default_source():
+    """The ECB history bundled with the currency_converter package, found without importing it."""
+    spec = importlib.util.find_spec("currency_converter")
+    if spec is None or not spec.submodule_search_locations:
+        raise FileNotFoundError("currency_converter is not installed; pass the path of a rate file")
+    return os.path.join(spec.submodule_search_locations[0], "eurofxref-hist.zip")
+
+
+def default_cache_path(source):
+    cache_dir = os.environ.get("RATE_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "fx-rates")
+    name = hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"rates-{name}.bin")
+
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def _source_lines(path):
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            with archive.open(archive.namelist()[0]) as f:
+                return io.TextIOWrapper(f, encoding="utf-8").read().splitlines()
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def parse_source(path):
+    """Parse an ECB-style CSV (Date,USD,JPY,...) or a zip of one into a dense RateTable."""
+    lines = iter(_source_lines(path))
+    currencies = [code.strip() for code in next(lines).strip().split(",")[1:]]
+    rows = {}
+    for line in lines:
+        fields = line.strip().split(",")
+        if fields[0]:
+            rows[date.fromisoformat(fields[0]).toordinal()] = fields[1:]
+    keep = [i for i, code in enumerate(currencies) if code]  # the ECB file ends with an empty column
+    codes = [currencies[i] for i in keep]
+    first_day, last_day = min(rows), max(rows)
+    days = last_day - first_day + 1
+    rates = array("d", [math.nan]) * (days * len(codes))
+    bounds = array("i", [-1, -1]) * len(codes)
+    for ordinal, fields in rows.items():
+        day = ordinal - first_day
+        for column, i in enumerate(keep):
+            value = fields[i].strip() if i < len(fields) else ""
+            if value in NA_VALUES:
+                continue
+            rates[day * len(codes) + column] = float(value)
+            if bounds[2 * column] < 0 or day < bounds[2 * column]:
+                bounds[2 * column] = day
+            bounds[2 * column + 1] = max(bounds[2 * column + 1], day)
+    return RateTable(first_day, days, codes, bounds, rates)
+
+
+def write_cache(path, table, source):
+    if sys.byteorder != "little":
+        raise ValueError("rate caches are only supported on little-endian machines")
+    stat = os.stat(source)
+    body = [",".join(table.currencies).encode("ascii"), table.bounds.tobytes(), table.rates.tobytes()]
+    crc = 0
+    for section in body:
+        crc = zlib.crc32(section, crc)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, 0, crc, table.days, len(table.currencies),
+                                   len(body[0]), table.first_day, stat.st_size, stat.st_mtime_ns,
+                                   _file_digest(source)))
+        for section in body:
+            f.write(section)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_cache(path, source):
+    """Map a cache file; None if it is missing, damaged or was built from a different source."""
+    if sys.byteorder != "little":
+        return None
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # missing, or empty (mmap refuses zero-length files)
+        return None
+    view = memoryview(mm)
+    if len(view) < _CACHE_HEADER.size:
+        return None
+    (magic, version, _, crc, days, count, codes_len, first_day,
+     size, mtime_ns, digest) = _CACHE_HEADER.unpack_from(view)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION:
+        return None
+    stat = os.stat(source)
+    if (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns) and digest != _file_digest(source):
+        return None  # the source changed (a touched but identical file still counts as a hit)
+    end = _CACHE_HEADER.size + codes_len + 8 * count + 8 * days * count
+    if len(view) != end or zlib.crc32(view[_CACHE_HEADER.size:]) != crc:
+        return None
+    pos = _CACHE_HEADER.size
+    codes = str(view[pos:pos + codes_len], "ascii").split(",")
+    pos += codes_len
+    bounds = view[pos:pos + 8 * count].cast("i")
+    pos += 8 * count
+    return RateTable(first_day, days, codes, bounds, view[pos:].cast("d"))
+
+
+class RateTable:
+    """EUR reference rates by day and currency; converts like CurrencyConverter's defaults.
+
+    As with CurrencyConverter() without fallbacks, a date with no published rate (weekends,
+    holidays, outside the currency's range) raises RateNotFoundError, and converting without a
+    date uses the last date the source currency has a rate for.
+    """
+
+    def __init__(self, first_day, days, currencies, bounds, rates):
+        self.first_day = first_day
+        self.days = days
+        self.currencies = currencies
+        self.bounds = bounds  # [first, last] day index with a rate, per currency
+        self.rates = rates  # days x currencies, row-major
+        self.columns = {code: i for i, code in enumerate(currencies)}
+        self._matrix = None
+
+    @classmethod
+    def load(cls, source=None, cache=None):
+        """Map the cached table for `source`, (re)building the cache first if it is stale."""
+        source = source or default_source()
+        cache = cache or default_cache_path(source)
+        table = read_cache(cache, source)
+        if table is None:
+            table = parse_source(source)
+            try:
+                write_cache(cache, table, source)
+            except (OSError, ValueError):
+                pass  # read-only or big-endian: still usable, just not cached
+        return table
+
+    def last_date(self, currency):
+        if currency == REF_CURRENCY:
+            return date.fromordinal(self.first_day + self.days - 1)
+        return date.fromordinal(self.first_day + self.bounds[2 * self.columns[currency] + 1])
+
+    def rate(self, currency, day):
+        """EUR -> currency rate on `day` (a date)."""
+        if currency == REF_CURRENCY:
+            return 1.0
+        index = day.toordinal() - self.first_day
+        rate = self.rates[index * len(self.currencies) + self.columns[currency]] if 0 <= index < self.days else math.nan
+        if math.isnan(rate):
+            raise RateNotFoundError(f"{currency} has no rate for {day}")
+        return rate
+
+    def convert(self, amount, currency, new_currency=REF_CURRENCY, date=None):
+        for code in (currency, new_currency):
+            if code != REF_CURRENCY and code not in self.columns:
+                raise ValueError(f"{code} is not a supported currency")
+        if date is None:
+            date = self.last_date(currency)
+        elif isinstance(date, datetime):
+            date = date.date()
+        return float(amount) / self.rate(currency, date) * self.rate(new_currency, date)
+
+    def rate_matrix(self):
+        """Days x currencies NumPy array of EUR rates, plus a last column of ones for EUR itself."""
+        if self._matrix is None:
+            _numpy()
+            count = len(self.currencies)
+            matrix = np.ones((self.days, count + 1))
+            matrix[:, :count] = np.frombuffer(self.rates, dtype=np.float64).reshape(self.days, count)
+            self._matrix = matrix
+        return self._matrix
+
+    def convert_many(self, amounts, columns, new_columns, days):
+        """Vectorized convert() over NumPy arrays.
+
+        Currencies are rate_matrix() column numbers (len(currencies) is EUR) and days count from
+        first_day, with -1 meaning the latest date as in convert(). Returns the converted amounts
+        and a mask of the rows that had a rate on both sides.
+        """
+        matrix = self.rate_matrix()
+        latest = np.append(np.frombuffer(self.bounds, dtype=np.int32)[1::2], self.days - 1)
+        days = np.where(days == -1, latest[columns], days)
+        in_range = (days >= 0) & (days < self.days)
+        days = np.where(in_range, days, 0)
+        rates, new_rates = matrix[days, columns], matrix[days, new_columns]
+        found = in_range & ~np.isnan(rates) & ~np.isnan(new_rates)
+        return amounts / rates * new_rates, found
+
+
+def convert_line(table, line):
+    """Convert one "amount,from,to,date" row as convert_file() does; the reference for its batches."""
+    try:
+        amount, currency, new_currency, day = (field.strip() for field in line.split(","))
+        return table.convert(amount, currency, new_currency, date.fromisoformat(day) if day else None)
+    except RateNotFoundError:
+        return NO_RATE
+    except ValueError:
+        return INVALID
+
+
+def _convert_chunk(table, lines, day_index):
+    # Only rows with exactly three commas are split together; the rest (blank lines included)
+    # go through convert_line() on their own, so a malformed row can never shift its fields
+    # onto its neighbours
+    commas = list(map(str.count, lines, repeat(",")))
+    if commas.count(3) == len(lines):
+        return _convert_rows(table, lines, day_index)
+    converted = iter(_convert_rows(table, [line for line, n in zip(lines, commas) if n == 3], day_index))
+    return [next(converted) if n == 3 else convert_line(table, line)
+            for line, n in zip(lines, commas) if n == 3 or line.strip()]
+
+
+def _convert_rows(table, lines, day_index):
+    # Split every row at C speed; rows that do not match the table exactly (unknown codes, dates
+    # in other formats or out of range, bad amounts) are flagged and run through convert_line()
+    if not lines:
+        return []
+    fields = ",".join(map(str.rstrip, lines, repeat("\r\n"))).split(",")
+    try:
+        amounts = np.array(list(map(float, fields[0::4])))
+    except ValueError:
+        amounts = np.array([_float_or_nan(value) for value in fields[0::4]])
+    eur = len(table.currencies)
+    columns = dict(table.columns, **{REF_CURRENCY: eur})
+    codes = np.array(list(map(columns.get, fields[1::4], repeat(-1))))
+    new_codes = np.array(list(map(columns.get, fields[2::4], repeat(-1))))
+    days = np.array(list(map(day_index.get, fields[3::4], repeat(-2))))
+    slow = (codes < 0) | (new_codes < 0) | (days == -2) | np.isnan(amounts)
+    converted, found = table.convert_many(amounts, np.maximum(codes, 0), np.maximum(new_codes, 0), days)
+    results = converted.tolist()
+    for i in np.flatnonzero(~found).tolist():
+        results[i] = NO_RATE
+    for i in np.flatnonzero(slow).tolist():
+        results[i] = convert_line(table, lines[i])
+    return results
+
+
+def _is_header(line):
+    # Column names, such as "amount,from,to,date"; any other first line is a row to convert
+    fields = line.split(",")
+    return len(fields) == 4 and all(field.strip().isidentifier() for field in fields)
+
+
+def _float_or_nan(value):
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+def convert_file(source, out, table=None, chunk_rows=CHUNK_ROWS, per_row=False):
+    """Stream "amount,from,to,date" rows from the file `source`, writing one result per line to `out`.
+
+    A blank date converts at the latest rate, as convert() does without one. Rows that do not
+    parse or name an unknown currency give "invalid"; rows with no rate on their date give
+    "no rate". Only one chunk is held in memory at a time. Returns (rows, seconds).
+    """
+    table = table or RateTable.load()
+    vectorize = not per_row and _numpy() is not None
+    if vectorize:
+        table.rate_matrix()
+        day_index = {date.fromordinal(table.first_day + day).isoformat(): day for day in range(table.days)}
+        day_index[""] = -1
+    started = time.perf_counter()
+    rows = 0
+    with open(source, newline="") as f:
+        first = f.readline()
+        pending = [] if _is_header(first) else [first]
+        while True:
+            lines = pending + list(islice(f, chunk_rows - len(pending)))
+            pending = []
+            if not lines:
+                break
+            if vectorize:
+                results = _convert_chunk(table, lines, day_index)
+            else:
+                results = [convert_line(table, line) for line in lines if line.strip()]
+            if results:
+                out.write("\n".join(map(str, results)) + "\n")
+            rows += len(results)
+    return rows, time.perf_counter() - started
@@ -1,73 +1,770 @@
+import contextlib
+import csv
+import json
+import queue
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from itertools import islice, repeat
+from datetime import datetime
+from decimal import Decimal
+
+DEPOSIT, WITHDRAWAL, TRANSFER_OUT, TRANSFER_IN, INTEREST = 1, 2, 3, 4, 5
+ENTRY_TYPES = {DEPOSIT: "deposit", WITHDRAWAL: "withdrawal", TRANSFER_OUT: "transfer out",
+               TRANSFER_IN: "transfer in", INTEREST: "interest"}
+RATE_SCALE = 10 ** 6  # interest rates are exact to a millionth
+
+StatementLine = namedtuple("StatementLine", "timestamp type amount balance")
+
+# How ConsoleSink renders each event; the fields come from the event itself
+MESSAGES = {
+    "account_created": "Account creation successful",
+    "account": "\nID: {account}\nHolder name: {holder_name}",
+    "account_not_found": "Account not found!",
+    "balance": "Balance: {balance}",
+    "deposit": "Deposit successful. Updated balance: {balance}",
+    "withdraw": "Withdraw successful. Updated balance: {balance}",
+    "transfer": "Transfer successful. {account} -> {to}: {amount}",
+    "interest": "Interest: {amount}",
+    "invalid_amount": "Invalid amount",
+    "insufficient_funds": "Insufficient funds",
+    "same_account": "Cannot transfer to the same account",
+}
+
+np = None
+
+
+def _load_numpy():
+    """NumPy is optional: batch posting uses it when installed and plain loops otherwise."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False  # remember the miss; a failed import is slow to repeat
+        np = numpy
+    return np or None
+
+
+def to_minor(amount):
+    """Convert an amount in currency units (int, float, str or Decimal) to integer cents."""
+    cents = Decimal(str(amount)) * 100
+    if cents != cents.to_integral_value():
+        raise ValueError(f"Amount {amount} has fractions of a cent")
+    return int(cents)
+
+
+def to_major(minor):
+    return Decimal(minor).scaleb(-2)
+
+
+def _parse_minor(text):
+    # Whole amounts are by far the most common in bulk files; skip Decimal for them
+    try:
+        return int(text) * 100
+    except ValueError:
+        return to_minor(text)
+
+
+def _scaled_tiers(tiers):
+    """[(from_balance, annual_rate), ...] -> [(from_cents, to_cents or None, rate in millionths)]."""
+    tiers = sorted((to_minor(start), Decimal(str(rate))) for start, rate in tiers)
+    bands = []
+    for i, (start, rate) in enumerate(tiers):
+        scaled = rate * RATE_SCALE
+        if rate < 0 or scaled != scaled.to_integral_value():
+            raise ValueError(f"Interest rate {rate} must be non-negative and exact to a millionth")
+        end = tiers[i + 1][0] if i + 1 < len(tiers) else None
+        bands.append((start, end, int(scaled)))
+    return bands
+
+
+def _divide_half_even(numerator, denominator):
+    quotient, remainder = divmod(numerator, denominator)
+    if 2 * remainder > denominator or (2 * remainder == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+def _interest_cents(balance, bands, periods):
+    # Each band's rate applies only to the slice of the balance that falls inside it
+    total = 0
+    for start, end, rate in bands:
+        if balance <= start:
+            break
+        total += ((balance if end is None else min(balance, end)) - start) * rate
+    return _divide_half_even(total, RATE_SCALE * periods)
+
+
+def _interest_cents_vectorized(balances, bands, periods):
+    # Same integer arithmetic as _interest_cents, one array operation per band
+    total = np.zeros(len(balances), dtype=np.int64)
+    for start, end, rate in bands:
+        portion = balances - start
+        if end is not None:
+            portion = np.minimum(portion, end - start)
+        total += np.maximum(portion, 0) * rate
+    denominator = RATE_SCALE * periods
+    quotient, remainder = np.divmod(total, denominator)
+    return quotient + ((2 * remainder > denominator) | ((2 * remainder == denominator) & (quotient % 2 == 1)))
+
+
+def _extend(column, values):
+    if isinstance(values, list):
+        column.extend(values)
+    else:
+        column.frombytes(values.astype(column.typecode).tobytes())
+
+
+class Ledger:
+    """Append-only record of every posting, stored column-wise in compact arrays.
+
+    Amounts are signed integer cents. Each account keeps its current balance, the indices of its
+    entries and its balance after every CHECKPOINT_EVERY entries, so balances are O(1) and
+    historical balances and statements only sum a few entries past the nearest checkpoint.
+
+    Accounts are guarded by STRIPES locks (key % STRIPES), taken in ascending order so that
+    operations on different accounts run side by side and a transfer can never deadlock. The
+    ledger's own lock only covers appending to the shared columns.
+    """
+    CHECKPOINT_EVERY = 64
+    STRIPES = 64
+
+    def __init__(self):
+        self.account_keys = array("q")
+        self.amounts = array("q")
+        self.types = array("b")
+        self.timestamps = array("d")
+        self.account_ids = []  # key -> account id
+        self._balances = array("q")
+        self._entries = []  # key -> array of entry indices
+        self._checkpoints = []  # key -> balance after every CHECKPOINT_EVERY-th entry
+        self._last_timestamp = 0.0
+        self._lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(self.STRIPES)]
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def open(self, account_id):
+        """Register an account and return its key for posting."""
+        with self._lock:
+            self.account_ids.append(account_id)
+            self._balances.append(0)
+            self._entries.append(array("q"))
+            self._checkpoints.append(array("q"))
+            return len(self.account_ids) - 1
+
+    def balance(self, key):
+        return self._balances[key]
+
+    @contextlib.contextmanager
+    def _locked(self, *keys):
+        stripes = sorted({key % self.STRIPES for key in keys})
+        for stripe in stripes:
+            self._stripes[stripe].acquire()
+        try:
+            yield
+        finally:
+            for stripe in reversed(stripes):
+                self._stripes[stripe].release()
+
+    def post(self, key, amount, entry_type, floor=None):
+        """Append a signed amount; refused (False) if it would take the balance below floor."""
+        with self._locked(key):
+            balance = self._balances[key] + amount
+            if floor is not None and amount < 0 and balance < floor:
+                return False
+            with self._lock:
+                self._record(key, amount, entry_type, balance)
+            return True
+
+    def transfer(self, from_key, to_key, amount, floor=None):
+        """Move a positive amount between two accounts as one step; False if it would cross floor."""
+        with self._locked(from_key, to_key):
+            balance = self._balances[from_key] - amount
+            if floor is not None and balance < floor:
+                return False
+            with self._lock:  # both legs are adjacent in the ledger and share a timestamp
+                self._record(from_key, -amount, TRANSFER_OUT, balance)
+                self._record(to_key, amount, TRANSFER_IN, self._balances[to_key] + amount)
+            return True
+
+    def credit(self, keys, amounts, entry_type):
+        """Append one positive amount to each of several distinct accounts in one go."""
+        with self._locked(*range(self.STRIPES)), self._lock:
+            if not keys:
+                return
+            self._last_timestamp = max(time.time(), self._last_timestamp)
+            first = len(self.amounts)
+            self.account_keys.extend(keys)
+            self.amounts.extend(amounts)
+            self.types.extend(repeat(entry_type, len(keys)))
+            self.timestamps.extend(repeat(self._last_timestamp, len(keys)))
+            balances, every = self._balances, self.CHECKPOINT_EVERY
+            for index, key, amount in zip(range(first, first + len(keys)), keys, amounts):
+                entries = self._entries[key]
+                entries.append(index)
+                balances[key] += amount
+                if len(entries) % every == 0:
+                    self._checkpoints[key].append(balances[key])
+
+    def _record(self, key, amount, entry_type, balance):
+        # Caller holds the key's stripe and self._lock.
+        # Timestamps never go backwards, so each account's entries stay sorted by time
+        self._last_timestamp = max(time.time(), self._last_timestamp)
+        entries = self._entries[key]
+        entries.append(len(self.amounts))
+        self.account_keys.append(key)
+        self.amounts.append(amount)
+        self.types.append(entry_type)
+        self.timestamps.append(self._last_timestamp)
+        self._balances[key] = balance
+        if len(entries) % self.CHECKPOINT_EVERY == 0:
+            self._checkpoints[key].append(balance)
+
+    def post_batch(self, keys, amounts, floors):
+        """Post many signed amounts at once; returns the positions that were refused.
+
+        keys and amounts are parallel sequences and floors maps each key to its floor. Each
+        account's rows are checked in their given order with the same rule as post().
+        """
+        if not keys:
+            return []
+        with self._locked(*range(self.STRIPES)), self._lock:
+            if _load_numpy() is not None:
+                return self._post_vectorized(keys, amounts, floors)
+            rows_by_key = {}
+            for i, key in enumerate(keys):
+                rows_by_key.setdefault(key, []).append(i)
+            refused = []
+            for key, rows in rows_by_key.items():
+                accepted, balances, refused_here = self._check_sequential(
+                    key, [amounts[i] for i in rows], floors[key])
+                self._append_run(key, accepted, balances)
+                refused.extend(rows[i] for i in refused_here)
+            return sorted(refused)
+
+    def _check_sequential(self, key, amounts, floor, balance=None):
+        balance = self._balances[key] if balance is None else balance
+        accepted, balances, refused = [], [], []
+        for i, amount in enumerate(amounts):
+            if floor is not None and amount < 0 and balance + amount < floor:
+                refused.append(i)
+                continue
+            balance += amount
+            accepted.append(amount)
+            balances.append(balance)
+        return accepted, balances, refused
+
+    def _append_run(self, key, accepted, balances):
+        count = len(accepted)
+        if not count:
+            return
+        self._last_timestamp = max(time.time(), self._last_timestamp)
+        self._entries[key].extend(range(len(self.amounts), len(self.amounts) + count))
+        self.account_keys.extend(repeat(key, count))
+        self.amounts.extend(accepted)
+        self.types.extend([WITHDRAWAL if amount < 0 else DEPOSIT for amount in accepted])
+        self.timestamps.extend(repeat(self._last_timestamp, count))
+        self._add_checkpoints(key, count, balances)
+        self._balances[key] = balances[-1]
+
+    def _add_checkpoints(self, key, count, balances):
+        # balances[i] is the balance after the i-th of the `count` entries just appended
+        posted = len(self._entries[key]) - count
+        first = self.CHECKPOINT_EVERY - 1 - posted % self.CHECKPOINT_EVERY
+        _extend(self._checkpoints[key], balances[first::self.CHECKPOINT_EVERY])
+
+    VECTOR_ROUNDS = 8  # refusals per account handled vectorized before falling back to a loop
+
+    def _post_vectorized(self, keys, amounts, floors):
+        # Rows are sorted by account (stably, so each account keeps its order) and every
+        # account's running balance comes from one cumsum over the whole batch. Each round
+        # refuses the first withdrawal per account that crosses its floor and recomputes
+        order = np.argsort(np.asarray(keys, dtype=np.int64), kind="stable")
+        keys = np.asarray(keys, dtype=np.int64)[order]
+        amounts = np.asarray(amounts, dtype=np.int64)[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        lengths = np.diff(np.r_[starts, len(keys)])
+        segment = np.repeat(np.arange(len(starts)), lengths)
+        segment_keys = keys[starts].tolist()
+        opening = np.array([self._balances[key] for key in segment_keys], dtype=np.int64)
+        floor = np.repeat(np.array([floors[key] for key in segment_keys], dtype=np.int64), lengths)
+
+        def running_balances(live):
+            total = np.cumsum(live)
+            before = total[starts] - live[starts]
+            return total - np.repeat(before - opening, lengths)
+
+        live = amounts.copy()  # refused rows become 0
+        refused = np.zeros(len(keys), dtype=bool)
+        for _ in range(self.VECTOR_ROUNDS + 1):
+            running = running_balances(live)
+            crossing = np.flatnonzero((running < floor) & (live < 0))
+            if not len(crossing):
+                break
+            crossing_segments = segment[crossing]
+            if _ == self.VECTOR_ROUNDS:
+                # Accounts refused over and over in one batch: finish them row by row
+                for s in np.unique(crossing_segments).tolist():
+                    start, end = int(starts[s]), int(starts[s] + lengths[s])
+                    _, _, refused_here = self._check_sequential(
+                        segment_keys[s], amounts[start:end].tolist(), floors[segment_keys[s]], int(opening[s]))
+                    refused[start:end] = False
+                    refused[[start + i for i in refused_here]] = True
+                live = np.where(refused, 0, amounts)
+                running = running_balances(live)
+                break
+            first = crossing[np.r_[True, crossing_segments[1:] != crossing_segments[:-1]]]
+            refused[first] = True
+            live[first] = 0
+
+        keep = ~refused
+        accepted, balances = amounts[keep], running[keep]
+        if len(accepted):
+            self._last_timestamp = max(time.time(), self._last_timestamp)
+            first_index = len(self.amounts)
+            _extend(self.account_keys, keys[keep])
+            _extend(self.amounts, accepted)
+            _extend(self.types, np.where(accepted < 0, WITHDRAWAL, DEPOSIT))
+            self.timestamps.extend(repeat(self._last_timestamp, len(accepted)))
+            counts = np.add.reduceat(keep, starts).tolist()
+            offset = 0
+            for key, count in zip(segment_keys, counts):
+                if count:
+                    self._entries[key].extend(range(first_index + offset, first_index + offset + count))
+                    self._add_checkpoints(key, count, balances[offset:offset + count])
+                    self._balances[key] = int(balances[offset + count - 1])
+                    offset += count
+        return np.sort(order[refused]).tolist()
+
+    def _balance_after(self, key, count):
+        # Balance after the account's first `count` entries
+        checkpoint = count // self.CHECKPOINT_EVERY
+        balance = self._checkpoints[key][checkpoint - 1] if checkpoint else 0
+        amounts = self.amounts
+        for i in self._entries[key][checkpoint * self.CHECKPOINT_EVERY:count]:
+            balance += amounts[i]
+        return balance
+
+    def _position(self, key, moment, side=bisect_right):
+        # Number of the account's entries posted before (or at) `moment`
+        timestamps = self.timestamps
+        return side(self._entries[key], moment.timestamp(), key=lambda i: timestamps[i])
+
+    def balance_at(self, key, moment):
+        with self._locked(key):
+            return self._balance_after(key, self._position(key, moment))
+
+    def statement(self, key, start=None, end=None):
+        """Entries for one account between two datetimes, each with the running balance."""
+        with self._locked(key):
+            entries = self._entries[key]
+            first = self._position(key, start, bisect_left) if start else 0
+            last = self._position(key, end) if end else len(entries)
+            balance = self._balance_after(key, first)
+            lines = []
+            for i in entries[first:last]:
+                balance += self.amounts[i]
+                lines.append(StatementLine(datetime.fromtimestamp(self.timestamps[i]),
+                                           ENTRY_TYPES[self.types[i]], to_major(self.amounts[i]),
+                                           to_major(balance)))
+            return lines
+
+
+class Result:
+    """What an account operation did; truthy when it succeeded."""
+    __slots__ = ("ok", "event", "balance")
+
+    def __init__(self, ok, event, balance=None):
+        self.ok = ok
+        self.event = event
+        self.balance = balance
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        return f"Result(ok={self.ok}, event={self.event!r}, balance={self.balance})"
+
+
+# ---------- Event sinks ----------
+# Accounts and banks publish a dict per operation ({"event": ..., "account": ..., "time": ...,
+# plus amount/balance where relevant}) to a sink instead of printing.
+class NullSink:
+    """Drops every event; for benchmarks and bulk jobs."""
+
+    def emit(self, event):
+        pass
+
+    def emit_many(self, events):
+        for event in events:
+            self.emit(event)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ConsoleSink(NullSink):
+    """Prints each event as the line the bank has always shown; the default."""
+
+    def emit(self, event):
+        print(MESSAGES[event["event"]].format(**event))
+
+
+class FileSink(NullSink):
+    """Buffers events in memory and appends them to a file as JSON lines, buffer_size at a time."""
+
+    def __init__(self, path, buffer_size=1000):
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._encoder = json.JSONEncoder(default=str, separators=(",", ":"))  # amounts are Decimals
+        self._file = open(path, "a", encoding="utf-8")
+
+    def emit(self, event):
+        with self._lock:
+            self._buffer.append(event)
+            if len(self._buffer) >= self.buffer_size:
+                self._write()
+
+    def emit_many(self, events):
+        with self._lock:
+            self._buffer.extend(events)
+            if len(self._buffer) >= self.buffer_size:
+                self._write()
+
+    def flush(self):
+        with self._lock:
+            self._write()
+            self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def _write(self):
+        if self._buffer:
+            encode = self._encoder.encode
+            self._file.write("".join(encode(event) + "\n" for event in self._buffer))
+            self._buffer = []
+
+
+class ThreadedSink(NullSink):
+    """Collects events in batches and hands each batch to another sink on a background thread.
+
+    If the wrapped sink fails, later batches are dropped and the error is raised from the next
+    emit(), flush() or close().
+    """
+
+    def __init__(self, sink, batch_size=1000):
+        self.sink = sink
+        self.batch_size = batch_size
+        self._batch = []
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="bank-events", daemon=True)
+        self._thread.start()
+
+    def emit(self, event):
+        self._check()
+        with self._lock:
+            self._batch.append(event)
+            if len(self._batch) >= self.batch_size:
+                self._queue.put(self._batch)
+                self._batch = []
+
+    def flush(self):
+        """Block until everything emitted so far has reached the wrapped sink and been flushed."""
+        done = threading.Event()
+        with self._lock:
+            if self._batch:
+                self._queue.put(self._batch)
+                self._batch = []
+            self._queue.put(done)
+        done.wait()
+        self._check()
+
+    def close(self):
+        if self._thread.is_alive():
+            with self._lock:
+                if self._batch:
+                    self._queue.put(self._batch)
+                    self._batch = []
+                self._queue.put(None)
+            self._thread.join()
+        try:
+            self.sink.close()
+        finally:
+            self._check()
+
+    def _check(self):
+        if self._error:
+            raise self._error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if not self._error:
+                try:
+                    if isinstance(item, threading.Event):
+                        self.sink.flush()
+                    else:
+                        self.sink.emit_many(item)
+                except Exception as e:
+                    self._error = e
+            if isinstance(item, threading.Event):
+                item.set()  # even after a failure, so flush() never waits forever
+
+
+DEFAULT_SINK = ConsoleSink()
+
+
 class Account:
-    def __init__(self, id, holder_name):
+    def __init__(self, id, holder_name, ledger=None, sink=None):
         self.id = id
         self.holder_name = holder_name
-        self._balance = 0  # encapsulation
+        self.ledger = ledger if ledger is not None else Ledger()
+        self.sink = sink or DEFAULT_SINK
+        self._key = self.ledger.open(id)
+
+    @property
+    def _balance(self):  # encapsulation; the ledger is the only source of truth
+        return to_major(self.ledger.balance(self._key))
+
+    def _emit(self, event, ok=True, **fields):
+        self.sink.emit({"event": event, "account": self.id, "time": time.time(), **fields})
+        return Result(ok, event, fields.get("balance"))
 
     def check_balance(self):
-        print(f"Balance: {self._balance}")
+        balance = self._balance
+        self._emit("balance", balance=balance)
+        return balance
 
     def deposit(self, amount):
-        self._balance += amount
-        print(f"Deposit successful. Updated balance: {self._balance}")
+        amount = to_minor(amount)
+        if amount <= 0:
+            return self._emit("invalid_amount", False, amount=to_major(amount))
+        self.ledger.post(self._key, amount, DEPOSIT)
+        return self._emit("deposit", amount=to_major(amount), balance=self._balance)
+
+    def _floor(self):
+        # Lowest balance a withdrawal may leave, in cents
+        return 0
 
     def withdraw(self, amount):
-        if self._balance >= amount:
-            self._balance -= amount
-            print(f"Withdraw successful. Updated balance: {self._balance}")
-        else:
-            print("Insufficient funds")
+        amount = to_minor(amount)
+        if amount <= 0:
+            return self._emit("invalid_amount", False, amount=to_major(amount))
+        if self.ledger.post(self._key, -amount, WITHDRAWAL, self._floor()):
+            return self._emit("withdraw", amount=to_major(amount), balance=self._balance)
+        return self._emit("insufficient_funds", False, amount=to_major(amount), balance=self._balance)
+
+    def balance_at(self, moment):
+        return to_major(self.ledger.balance_at(self._key, moment))
+
+    def statement(self, start=None, end=None):
+        return self.ledger.statement(self._key, start, end)
 
 
 class SavingsAccount(Account):
-    def calculate_interest(self):
-        INTEREST_RATE = 0.04  # 4%
-        interest = self._balance * INTEREST_RATE
-        print(f"Interest: {interest}")
+    INTEREST_TIERS = ((0, "0.04"),)  # (from balance, annual rate); 4% on everything
+
+    def calculate_interest(self, periods=1):
+        """Interest on the current balance for one of `periods` per year, rounded to the cent."""
+        cents = _interest_cents(self.ledger.balance(self._key), _scaled_tiers(self.INTEREST_TIERS), periods)
+        interest = to_major(cents)
+        self._emit("interest", amount=interest)
+        return interest
 
 
 class CurrentAccount(Account):
-    def withdraw(self, amount):  # polymorphism
-        OVER_DRAFT = 1000
-        if self._balance + OVER_DRAFT >= amount:
-            self._balance -= amount
-            print(f"Withdraw successful. Updated balance: {self._balance}")
-        else:
-            print("Insufficient funds")
+    OVER_DRAFT = 1000
+
+    def _floor(self):  # polymorphism
+        return -to_minor(self.OVER_DRAFT)
 
 
 class Bank:
-    def __init__(self, name, city):
+    BATCH_ROWS = 100_000  # transactions read and applied at a time
+
+    def __init__(self, name, city, sink=None):
+        """sink receives an event per operation (default: printed to the console)."""
         self.name = name
         self.city = city
         self.__accounts = {}
+        self.ledger = Ledger()  # shared by all of the bank's accounts
+        self.sink = sink or DEFAULT_SINK
+
+    def _emit(self, event, account_id, **fields):
+        self.sink.emit({"event": event, "account": account_id, "time": time.time(), **fields})
 
     def create_account(self, id, holder_name, type):
         if type == 'savings':
-            new_account = SavingsAccount(id, holder_name)
+            new_account = SavingsAccount(id, holder_name, self.ledger, self.sink)
         elif type == 'current':
-            new_account = CurrentAccount(id, holder_name)
+            new_account = CurrentAccount(id, holder_name, self.ledger, self.sink)
         self.__accounts[id] = new_account
-        print("Account creation successful")
+        self._emit("account_created", id, holder_name=holder_name, type=type)
         return new_account
 
     def get_account(self, id):
         if id not in self.__accounts:
-            print("Account not found!")
+            self._emit("account_not_found", id)
             return None
         else:
             account = self.__accounts[id]
-            print(f"\nID: {account.id}\nHolder name: {account.holder_name}")
+            self._emit("account", account.id, holder_name=account.holder_name)
             return account
 
+    def apply_interest(self, tiers=None, periods=12):
+        """Credit one period's interest to every savings account and return what was paid.
+
+        tiers is [(from_balance, annual_rate), ...] (default SavingsAccount.INTEREST_TIERS), each
+        rate applying to the slice of the balance above its threshold. Interest is computed in
+        integer cents and rounded half to even; balances are read once at the start of the run.
+        """
+        start = time.perf_counter()
+        bands = _scaled_tiers(tiers or SavingsAccount.INTEREST_TIERS)
+        savings = [account for account in self.__accounts.values() if isinstance(account, SavingsAccount)]
+        keys = [account._key for account in savings]
+        balances = [self.ledger.balance(key) for key in keys]
+        # NumPy works in int64; fall back to Python ints for balances that could overflow it
+        limit = (2 ** 63 - 1) // max(sum(rate for _, _, rate in bands), 1)
+        if _load_numpy() is not None and max(balances, default=0) < limit:
+            interest = _interest_cents_vectorized(np.array(balances, dtype=np.int64), bands, periods).tolist()
+        else:
+            interest = [_interest_cents(balance, bands, periods) for balance in balances]
+        paid = [i for i, cents in enumerate(interest) if cents > 0]
+        self.ledger.credit([keys[i] for i in paid], [interest[i] for i in paid], INTEREST)
+        return {
+            "accounts": len(keys),
+            "credited": len(paid),
+            "total": to_major(sum(interest)),
+            "account_ids": [account.id for account in savings],
+            "interest_cents": array("q", interest),
+            "seconds": time.perf_counter() - start,
+        }
+
+    def transfer(self, from_id, to_id, amount):
+        """Move money between two of the bank's accounts; both legs happen or neither does."""
+        source, target = self.__accounts.get(from_id), self.__accounts.get(to_id)
+        if source is None or target is None:
+            self._emit("account_not_found", from_id if source is None else to_id)
+            return Result(False, "account_not_found")
+        if source is target:
+            return source._emit("same_account", False)
+        amount = to_minor(amount)
+        if amount <= 0:
+            return source._emit("invalid_amount", False, amount=to_major(amount))
+        if self.ledger.transfer(source._key, target._key, amount, source._floor()):
+            return source._emit("transfer", to=target.id, amount=to_major(amount), balance=source._balance)
+        return source._emit("insufficient_funds", False, amount=to_major(amount), balance=source._balance)
+
+    def flush(self):
+        self.sink.flush()
+
+    def close(self):
+        self.sink.close()
+
+    def process_batch(self, source, rejects=None, chunk_rows=None):
+        """Apply a CSV of transactions (header account_id,type,amount; type deposit or withdraw).
 
-sbk = Bank('Shiva', 'Shivamogga')
+        Rows are read chunk_rows at a time, grouped by account and posted in file order with the
+        same rules as deposit()/withdraw(). Refused rows go to `rejects` (a path or file object)
+        with their row number and reason.
+        """
+        chunk_rows = chunk_rows or self.BATCH_ROWS
+        start = time.perf_counter()
+        rows = accepted = refused = 0
+        with contextlib.ExitStack() as stack:
+            if isinstance(source, str):
+                source = stack.enter_context(open(source, newline="", encoding="utf-8"))
+            if isinstance(rejects, str):
+                rejects = stack.enter_context(open(rejects, "w", newline="", encoding="utf-8"))
+            reader = csv.reader(source)
+            header = next(reader, None)
+            if header is None:  # empty file: nothing to post
+                header = ["account_id", "type", "amount"]
+            columns = [header.index(name) for name in ("account_id", "type", "amount")]
+            writer = csv.writer(rejects) if rejects is not None else None
+            if writer:
+                writer.writerow(["row", *header, "reason"])
+            while True:
+                chunk = list(islice(reader, chunk_rows))
+                if not chunk:
+                    break
+                chunk_refused = self._apply_chunk(chunk, rows + 2, columns)
+                rows += len(chunk)
+                refused += len(chunk_refused)
+                accepted += len(chunk) - len(chunk_refused)
+                if writer:
+                    writer.writerows([row_no, *row, reason] for row_no, row, reason in sorted(chunk_refused))
+        seconds = time.perf_counter() - start
+        return {
+            "rows": rows,
+            "accepted": accepted,
+            "rejected": refused,
+            "seconds": seconds,
+            "rows_per_sec": rows / seconds if seconds else 0.0,
+        }
 
-s1 = sbk.create_account("1", "Shiva", "savings")
-c1 = sbk.create_account("2", "Shankar", "current")
+    def _apply_chunk(self, chunk, first_row_no, columns):
+        id_col, type_col, amount_col = columns
+        accounts = self.__accounts
+        refused = []
+        row_nos, keys, amounts, floors = [], [], [], {}
+        for row_no, row in enumerate(chunk, first_row_no):
+            try:
+                account = accounts.get(row[id_col])
+                kind, amount = row[type_col], _parse_minor(row[amount_col])
+            except (IndexError, ArithmeticError, ValueError):
+                refused.append((row_no, row, "Invalid row"))
+                continue
+            if account is None:
+                refused.append((row_no, row, "Account not found!"))
+            elif amount <= 0:
+                refused.append((row_no, row, "Invalid amount"))
+            elif kind not in ("deposit", "withdraw"):
+                refused.append((row_no, row, f"Unknown transaction type {kind!r}"))
+            else:
+                key = account._key
+                if key not in floors:
+                    floors[key] = account._floor()
+                row_nos.append(row_no)
+                keys.append(key)
+                amounts.append(amount if kind == "deposit" else -amount)
+        for i in self.ledger.post_batch(keys, amounts, floors):
+            refused.append((row_nos[i], chunk[row_nos[i] - first_row_no], "Insufficient funds"))
+        return refused
 
 
-sbk.get_account("1")
+if __name__ == "__main__":
+    if len(sys.argv) in (4, 5) and sys.argv[1] == "batch":
+        # python bank.py batch accounts.csv transactions.csv [rejects.csv]
+        # accounts.csv has the header id,holder_name,type
+        bank = Bank("Batch", "Batch", sink=NullSink())
+        with open(sys.argv[2], newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                bank.create_account(row["id"], row["holder_name"], row["type"])
+        result = bank.process_batch(sys.argv[3], sys.argv[4] if len(sys.argv) == 5 else None)
+        print(f"Applied {result['accepted']} of {result['rows']} transactions, rejected {result['rejected']} "
+              f"in {result['seconds']:.2f}s ({result['rows_per_sec']:.0f} rows/sec)")
+        sys.exit(0)
 
+    sbk = Bank('Shiva', 'Shivamogga')
 
+    s1 = sbk.create_account("1", "Shiva", "savings")
+    c1 = sbk.create_account("2", "Shankar", "current")
 
+    sbk.get_account("1")
@@ -0,0 +1,76 @@
+# Per-operation cost of Bank/Account calls with each event sink in bank.py
+#
+#   python bank_bench.py --ops 100000
+#
+# "console" is the old behaviour (a formatted line per call); its output goes to os.devnull so the
+# numbers show the cost of formatting and print() itself, not of scrolling a terminal.
+
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import time
+
+from bank import Bank, ConsoleSink, FileSink, NullSink, ThreadedSink
+
+
+def make_sink(name, workdir):
+    path = os.path.join(workdir, f"{name}.jsonl")
+    if name == "console":
+        return ConsoleSink()
+    if name == "file":
+        return FileSink(path)
+    if name == "threaded-file":
+        return ThreadedSink(FileSink(path))
+    return NullSink()
+
+
+def bench(sink, ops, seed):
+    rng = random.Random(seed)
+    bank = Bank("Bench", "Bench", sink=sink)
+    ids = [str(i) for i in range(1000)]
+    timings = {}
+
+    def timed(name, fn, count):
+        started = time.perf_counter()
+        for _ in range(count):
+            fn()
+        timings[name] = (time.perf_counter() - started) / count * 1e6
+
+    created = iter(ids)
+    timed("create_account", lambda: bank.create_account(next(created), "Holder", rng.choice(["savings", "current"])),
+          len(ids))
+    accounts = [bank.get_account(i) for i in ids]
+    timed("deposit", lambda: rng.choice(accounts).deposit(100), ops)
+    timed("withdraw", lambda: rng.choice(accounts).withdraw(30), ops)
+    timed("check_balance", lambda: rng.choice(accounts).check_balance(), ops)
+    timed("transfer", lambda: bank.transfer(*rng.sample(ids, 2), 10), ops)
+    started = time.perf_counter()
+    bank.close()  # the buffered sinks pay for their writes here
+    timings["close"] = (time.perf_counter() - started) * 1e6
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time Bank operations with each event sink.")
+    parser.add_argument("--ops", type=int, default=100_000, help="calls per operation")
+    parser.add_argument("--sinks", nargs="+", default=["console", "file", "threaded-file", "null"])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, "w") as devnull:
+        for name in args.sinks:
+            with contextlib.redirect_stdout(devnull):
+                results[name] = bench(make_sink(name, workdir), args.ops, args.seed)
+
+    operations = list(next(iter(results.values())))
+    print(f"{'us per call':<16}" + "".join(f"{name:>15}" for name in results))
+    for operation in operations:
+        unit = " (total)" if operation == "close" else ""
+        print(f"{operation + unit:<16}" + "".join(f"{results[name][operation]:15.2f}" for name in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Concurrency benchmark and invariant check for Bank.transfer in bank.py
+# Many threads move money between random accounts at once; afterwards the total must be unchanged,
+# no account may sit below its floor and every balance must equal the sum of its ledger entries.
+#
+#   python bank_stress.py --threads 1 2 4 8 --transfers 20000
+#   python bank_stress.py --stripes 1        # one lock for everything, for comparison
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from bank import Bank, Ledger, NullSink, to_minor
+
+OPENING_BALANCE = 1000
+
+
+def make_bank(accounts):
+    bank = Bank("Stress", "Test", sink=NullSink())
+    for i in range(accounts):
+        account = bank.create_account(str(i), f"Holder {i}", "current" if i % 2 else "savings")
+        account.deposit(OPENING_BALANCE)
+    return bank
+
+
+def run(bank, threads, args):
+    succeeded = [0] * threads
+
+    def worker(n):
+        rng = random.Random(args.seed + n)
+        ok = 0
+        for _ in range(args.transfers):
+            source, target = rng.sample(range(args.accounts), 2)
+            ok += bool(bank.transfer(str(source), str(target), rng.choice([5, 50, 500, 1500])))
+        succeeded[n] = ok
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(succeeded), time.perf_counter() - started
+
+
+def check(bank, args, succeeded):
+    """Return a list of problems; empty means money was conserved and nothing was lost."""
+    ledger = bank.ledger
+    problems = []
+    total = sum(ledger.balance(key) for key in range(len(ledger.account_ids)))
+    if total != args.accounts * to_minor(OPENING_BALANCE):
+        problems.append(f"total is {total} cents, expected {args.accounts * to_minor(OPENING_BALANCE)}")
+    accounts = [bank.get_account(account_id) for account_id in ledger.account_ids]
+    for account in accounts:
+        balance = ledger.balance(account._key)
+        if balance < account._floor():
+            problems.append(f"account {account.id} is at {balance} cents, below its floor")
+        if balance != sum(ledger.amounts[i] for i in ledger._entries[account._key]):
+            problems.append(f"account {account.id}: balance does not match its ledger entries")
+    transfers = len(ledger) - args.accounts  # one opening deposit per account, two entries per transfer
+    if transfers != 2 * succeeded:
+        problems.append(f"{transfers // 2} transfers in the ledger, {succeeded} reported successful")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hammer Bank.transfer from many threads.")
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--transfers", type=int, default=20_000, help="transfer attempts per thread")
+    parser.add_argument("--stripes", type=int, default=Ledger.STRIPES, help="account lock stripes")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    Ledger.STRIPES = args.stripes
+
+    failed = False
+    for threads in args.threads:
+        bank = make_bank(args.accounts)
+        succeeded, elapsed = run(bank, threads, args)
+        problems = check(bank, args, succeeded)
+        failed = failed or bool(problems)
+        attempts = threads * args.transfers
+        print(f"{threads} threads, {args.stripes} stripes: {attempts} attempts, {succeeded} transferred, "
+              f"{attempts / elapsed:.0f} transfers/sec, {'OK' if not problems else 'FAILED'}")
+        for problem in problems[:20]:
+            print(f"  - {problem}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,17 @@
 # Each appointment should store the doctor-patient relationship, along with the date and time.
 # Add functionality for doctors' schedules and ensuring no double booking.
 
-from datetime import datetime
+import asyncio
+import heapq
+import json
+import os
+import threading
+import time as clock
+from bisect import bisect_left, insort
+from datetime import datetime, time, timedelta
+
+DEFAULT_DURATION = timedelta(minutes=30)
+WORKING_HOURS = (time(9, 0), time(17, 0))
 
 
 class Doctor:
@@ -13,19 +23,96 @@ class Doctor:
         self.doctor_id = doctor_id
         self.name = name
         self.specialty = specialty
-        self.schedule = []  # List of appointment datetime objects
+        # Sorted, non-overlapping (start, end, appointment_id) intervals. Because they never overlap,
+        # the ends are sorted too, which is what makes every lookup a bisect.
+        self.schedule = []
+        # Guards check-then-insert on this doctor only, so bookings for different doctors never contend.
+        # Reentrant so Hospital can hold it across a change and its log record.
+        self.lock = threading.RLock()
 
-    def is_available(self, appointment_time):
-        """Check if doctor is available at the given time."""
-        return appointment_time not in self.schedule
+    def is_available(self, appointment_time, duration=DEFAULT_DURATION):
+        """Check if doctor is free for the whole slot starting at the given time."""
+        end_time = appointment_time + duration
+        # Only the last interval starting before end_time can reach past appointment_time
+        i = bisect_left(self.schedule, (end_time,))
+        return i == 0 or self.schedule[i - 1][1] <= appointment_time
 
-    def add_appointment(self, appointment_time):
+    def add_appointment(self, appointment_time, duration=DEFAULT_DURATION, appointment_id=None):
         """Add an appointment to the doctor's schedule."""
-        if self.is_available(appointment_time):
-            self.schedule.append(appointment_time)
-            return True
+        with self.lock:
+            if self.is_available(appointment_time, duration):
+                insort(self.schedule, (appointment_time, appointment_time + duration, appointment_id))
+                return True
         return False
 
+    def remove_appointment(self, appointment_time, duration=DEFAULT_DURATION, appointment_id=None):
+        """Free the slot held by this appointment; returns False if it was not on the schedule.
+
+        Without an appointment_id, whichever appointment holds exactly that slot is freed.
+        """
+        with self.lock:
+            return self._remove_slot(appointment_time, appointment_time + duration, appointment_id) is not None
+
+    def move_appointment(self, old_time, old_duration, new_time, new_duration, appointment_id=None):
+        """Move a booked slot in one step; the old slot is kept if the new one is taken."""
+        with self.lock:
+            old_slot = self._remove_slot(old_time, old_time + old_duration, appointment_id)
+            if old_slot is None:
+                return False
+            if self.is_available(new_time, new_duration):
+                insort(self.schedule, (new_time, new_time + new_duration, old_slot[2]))
+                return True
+            insort(self.schedule, old_slot)
+            return False
+
+    def _remove_slot(self, start, end, appointment_id):
+        # Only the exact interval, and only if it is that appointment's: a slot another appointment
+        # holds now stays. Intervals never overlap, so at most one starts at `start`.
+        i = bisect_left(self.schedule, (start,))
+        if (i < len(self.schedule) and self.schedule[i][:2] == (start, end)
+                and appointment_id in (None, self.schedule[i][2])):
+            return self.schedule.pop(i)
+        return None
+
+    def _first_ending_after(self, moment):
+        # Index of the first appointment still running at or starting after `moment`
+        i = bisect_left(self.schedule, (moment,))
+        if i > 0 and self.schedule[i - 1][1] > moment:
+            i -= 1
+        return i
+
+    def appointments_between(self, start, end):
+        """Yield (start, end) of appointments overlapping [start, end), in time order."""
+        i = self._first_ending_after(start)
+        while i < len(self.schedule) and self.schedule[i][0] < end:
+            yield self.schedule[i][:2]
+            i += 1
+
+    def free_gaps(self, after, working_hours=WORKING_HOURS, until=None):
+        """Yield (start, end) free periods inside working hours from `after` on, in time order."""
+        open_time, close_time = working_hours
+        i = self._first_ending_after(after)
+        day = after.date()
+        while True:
+            day_start = datetime.combine(day, open_time)
+            if until is not None and day_start >= until:
+                return
+            day_end = datetime.combine(day, close_time)
+            if until is not None:
+                day_end = min(day_end, until)
+            cursor = max(after, day_start)
+            while cursor < day_end:
+                if i < len(self.schedule) and self.schedule[i][0] < day_end:
+                    start, end, _ = self.schedule[i]
+                    if start > cursor:
+                        yield cursor, start
+                    cursor = max(cursor, end)
+                    i += 1
+                else:
+                    yield cursor, day_end
+                    break
+            day += timedelta(days=1)
+
     def __str__(self):
         return f"Dr. {self.name} {self.specialty}"
 
@@ -41,29 +128,249 @@ class Patient:
 
 
 class Appointment:
-    def __init__(self, doctor, patient, appointment_time):
+    def __init__(self, doctor, patient, appointment_time, duration=DEFAULT_DURATION):
+        self.appointment_id = None  # assigned by the AppointmentStore
         self.doctor = doctor
         self.patient = patient
         self.appointment_time = appointment_time
+        self.duration = duration
+
+    @property
+    def end_time(self):
+        return self.appointment_time + self.duration
 
     def __str__(self):
-        return f"Appointment: {self.appointment_time.strftime('%Y-%m-%d %H:%M')} - {self.doctor} with {self.patient}"
+        return (f"Appointment: {self.appointment_time.strftime('%Y-%m-%d %H:%M')}-{self.end_time.strftime('%H:%M')}"
+                f" - {self.doctor} with {self.patient}")
+
+
+class AppointmentStore:
+    """Appointments indexed by doctor, patient and day; every index is kept in time order."""
+
+    def __init__(self):
+        self._appointments = {}  # appointment_id -> Appointment
+        self._by_doctor = {}  # doctor_id -> sorted [(time, appointment_id)]
+        self._by_patient = {}  # patient_id -> sorted [(time, appointment_id)]
+        self._by_day = {}  # date -> sorted [(time, appointment_id)]
+        self._days = []  # sorted keys of _by_day
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._appointments)
+
+    def __iter__(self):
+        """All appointments in time order, one day at a time."""
+        for day in list(self._days):
+            yield from self.on(day)
+
+    def get(self, appointment_id):
+        return self._appointments.get(appointment_id)
+
+    def add(self, appointment, appointment_id=None):
+        with self._lock:
+            if appointment_id is None:
+                appointment_id = self._next_id
+            appointment.appointment_id = appointment_id
+            self._next_id = max(self._next_id, appointment_id + 1)
+            self._appointments[appointment_id] = appointment
+            self._index(appointment)
+        return appointment
+
+    def bulk_add(self, appointments, next_id=1):
+        """Add appointments that already carry ids, sorting each index once instead of per insert."""
+        with self._lock:
+            for appointment in appointments:
+                self._appointments[appointment.appointment_id] = appointment
+                entry = (appointment.appointment_time, appointment.appointment_id)
+                for index, key in self._index_keys(appointment):
+                    index.setdefault(key, []).append(entry)
+                self._next_id = max(self._next_id, appointment.appointment_id + 1)
+            for index in (self._by_doctor, self._by_patient, self._by_day):
+                for entries in index.values():
+                    entries.sort()
+            self._days = sorted(self._by_day)
+            self._next_id = max(self._next_id, next_id)
+
+    def snapshot(self):
+        """A consistent-enough copy for persistence: (appointments, next id)."""
+        with self._lock:
+            return list(self._appointments.values()), self._next_id
+
+    def remove(self, appointment_id):
+        with self._lock:
+            appointment = self._appointments.pop(appointment_id, None)
+            if appointment is not None:
+                self._unindex(appointment)
+        return appointment
+
+    def move(self, appointment_id, new_time, new_duration):
+        with self._lock:
+            appointment = self._appointments[appointment_id]
+            self._unindex(appointment)
+            appointment.appointment_time = new_time
+            appointment.duration = new_duration
+            self._index(appointment)
+        return appointment
+
+    def on(self, day):
+        yield from self._walk(self._by_day.get(day, ()))
+
+    def for_patient(self, patient_id, start=None, end=None):
+        yield from self._walk(self._by_patient.get(patient_id, ()), start, end)
+
+    def for_doctor(self, doctor_id, start=None, end=None):
+        yield from self._walk(self._by_doctor.get(doctor_id, ()), start, end)
+
+    def _walk(self, entries, start=None, end=None):
+        # Lazy: appointments are fetched one at a time as the caller consumes them
+        i = 0 if start is None else bisect_left(entries, (start,))
+        while i < len(entries):
+            appointment_time, appointment_id = entries[i]
+            if end is not None and appointment_time >= end:
+                return
+            appointment = self._appointments.get(appointment_id)
+            if appointment is not None:
+                yield appointment
+            i += 1
+
+    def _index(self, appointment):
+        entry = (appointment.appointment_time, appointment.appointment_id)
+        for index, key in self._index_keys(appointment):
+            if key not in index:
+                index[key] = []
+                if index is self._by_day:
+                    insort(self._days, key)
+            insort(index[key], entry)
+
+    def _unindex(self, appointment):
+        entry = (appointment.appointment_time, appointment.appointment_id)
+        for index, key in self._index_keys(appointment):
+            entries = index[key]
+            del entries[bisect_left(entries, entry)]
+            if not entries:
+                del index[key]
+                if index is self._by_day:
+                    del self._days[bisect_left(self._days, key)]
+
+    def _index_keys(self, appointment):
+        return ((self._by_doctor, appointment.doctor.doctor_id),
+                (self._by_patient, appointment.patient.patient_id),
+                (self._by_day, appointment.appointment_time.date()))
+
+
+class _FreeGaps:
+    """One specialty's free gaps, by day, kept current through a waitlist run.
+
+    Each day's gaps are read from the doctors' schedules once, on first use. A booking then
+    splits its gap, so no patient's search re-walks intervals booked earlier in the run.
+    """
+
+    def __init__(self, doctors, working_hours):
+        self.doctors = doctors
+        self.working_hours = working_hours
+        self._days = {}  # date -> sorted [(start, end, doctor index)]
+        self._full = {}  # (duration, date) -> a later date; no gap that day is that long
+
+    def find(self, after, duration, until, best_fit):
+        """(start, doctor index) of the slot to try, or None if nothing fits before `until`."""
+        day = after.date()
+        while self.doctors:
+            day = self._next_open(duration, day)
+            if datetime.combine(day, self.working_hours[0]) >= until:
+                return None
+            best = None
+            longest = timedelta()
+            for start, end, n in self._gaps(day):
+                longest = max(longest, end - start)
+                start, end = max(start, after), min(end, until)
+                if end - start >= duration:
+                    key = (end - start, start, n) if best_fit else (start, end, n)
+                    best = min(best or key, key)
+            if best:
+                return best[1:] if best_fit else (best[0], best[2])
+            if longest < duration:
+                self._full[duration, day] = day + timedelta(days=1)
+            day += timedelta(days=1)
+        return None
+
+    def take(self, start, duration, n):
+        """Split the gap a booking went into, keeping what is left on either side."""
+        gaps = self._days[start.date()]
+        for i, (gap_start, gap_end, gap_n) in enumerate(gaps):
+            if gap_n == n and gap_start <= start < gap_end:
+                del gaps[i]
+                if gap_start < start:
+                    insort(gaps, (gap_start, start, n))
+                if start + duration < gap_end:
+                    insort(gaps, (start + duration, gap_end, n))
+                return
+
+    def refresh(self, day, n):
+        """Re-read one doctor's gaps for a day, after a booking made elsewhere took part of one."""
+        gaps = [gap for gap in self._days.pop(day) if gap[2] != n]
+        self._days[day] = sorted(gaps + self._doctor_gaps(day, n))
+
+    def _next_open(self, duration, day):
+        # Skips days known to be too full, compressing the chain as it goes
+        passed = []
+        while (duration, day) in self._full:
+            passed.append(day)
+            day = self._full[duration, day]
+        for full_day in passed:
+            self._full[duration, full_day] = day
+        return day
+
+    def _gaps(self, day):
+        gaps = self._days.get(day)
+        if gaps is None:
+            gaps = self._days[day] = sorted(gap for n in range(len(self.doctors))
+                                            for gap in self._doctor_gaps(day, n))
+        return gaps
+
+    def _doctor_gaps(self, day, n):
+        open_time, close_time = self.working_hours
+        day_start, day_end = datetime.combine(day, open_time), datetime.combine(day, close_time)
+        gaps = self.doctors[n].free_gaps(day_start, self.working_hours, day_end)
+        return [(start, end, n) for start, end in gaps]
 
 
 class Hospital:
-    def __init__(self, name):
+    SNAPSHOT_EVERY = 100_000  # logged events between automatic snapshots
+
+    def __init__(self, name, log_file=None, sync=True):
+        """With a log_file, every change is appended to it and replayed on the next start.
+
+        The log is folded into `<log_file>.snapshot` every SNAPSHOT_EVERY events. With sync=True
+        (the default) each change is fsynced before the call that made it returns.
+        """
         self.name = name
         self.doctors = {}
+        self.doctors_by_specialty = {}  # specialty -> list of doctors
         self.patients = {}
-        self.appointments = {}
+        self.appointments = AppointmentStore()
+        self.log_file = log_file
+        self.sync = sync
+        self._log = None
+        self._log_lock = threading.Lock()
+        self._logged_events = 0
+        if log_file:
+            self._recover()
+            self._log = open(log_file, "a", encoding="utf-8")
 
     def add_doctor(self, doctor):
+        old = self.doctors.get(doctor.doctor_id)
+        if old is not None:
+            self.doctors_by_specialty[old.specialty].remove(old)
         self.doctors[doctor.doctor_id] = doctor
+        self.doctors_by_specialty.setdefault(doctor.specialty, []).append(doctor)
+        self._record({"e": "doctor", "id": doctor.doctor_id, "name": doctor.name, "specialty": doctor.specialty})
 
     def add_patient(self, patient):
         self.patients[patient.patient_id] = patient
+        self._record({"e": "patient", "id": patient.patient_id, "name": patient.name, "ailment": patient.ailment})
 
-    def book_appointment(self, doctor_id, patient_id, appointment_time):
+    def book_appointment(self, doctor_id, patient_id, appointment_time, duration=DEFAULT_DURATION):
         """Book an appointment if doctor is available."""
         doctor = self.doctors.get(doctor_id)
         patient = self.patients.get(patient_id)
@@ -72,14 +379,302 @@ class Hospital:
             print("Invalid doctor or patient ID.")
             return
 
-        if doctor.is_available(appointment_time):
-            doctor.add_appointment(appointment_time)
-            appointment = Appointment(doctor, patient, appointment_time)
-            self.appointments.append(appointment)
+        appointment = self._book(doctor, patient, appointment_time, duration)
+        if appointment:
             print(f"✅ Appointment booked successfully:\n{appointment}")
+            return appointment
         else:
             print(f"❌ Doctor {doctor.name} is not available at {appointment_time}.")
 
+    def _book(self, doctor, patient, appointment_time, duration):
+        # The booking rule itself, without the console output. The doctor's lock is held until the
+        # change is logged, so the log has each doctor's changes in the order they happened.
+        with doctor.lock:
+            if not doctor.is_available(appointment_time, duration):
+                return None
+            appointment = self.appointments.add(Appointment(doctor, patient, appointment_time, duration))
+            doctor.add_appointment(appointment_time, duration, appointment.appointment_id)
+            self._record({"e": "book", "id": appointment.appointment_id, "doctor": doctor.doctor_id,
+                          "patient": patient.patient_id, "time": appointment_time.isoformat(),
+                          "seconds": duration.total_seconds()})
+        return appointment
+
+    def find_earliest_slot(self, specialty, after, duration=DEFAULT_DURATION, working_hours=WORKING_HOURS,
+                           horizon=timedelta(days=90), patient_id=None):
+        """Find the earliest (doctor, start) free for `duration` among doctors of a specialty.
+
+        With a patient_id the slot is booked straight away and the Appointment is returned;
+        if another booking takes the slot first, the search runs again.
+        Returns None if nothing is free within `horizon` of `after` or the patient is unknown.
+        """
+        patient = None
+        if patient_id is not None:
+            patient = self.patients.get(patient_id)
+            if patient is None:
+                print("Invalid patient ID.")
+                return None
+        while True:
+            found = self._earliest_slot(specialty, after, duration, working_hours, after + horizon)
+            if found is None or patient is None:
+                return found
+            doctor, start = found
+            # _book only fails when the slot was taken since the search, so every retry makes progress
+            appointment = self._book(doctor, patient, start, duration)
+            if appointment:
+                return appointment
+
+    def _earliest_slot(self, specialty, after, duration, working_hours, until):
+        slot = next(self._free_slots(specialty, after, duration, working_hours, until), None)
+        return slot and (slot[2], slot[0])
+
+    def _free_slots(self, specialty, after, duration, working_hours, until):
+        # Merge every doctor's free gaps in start order and yield (start, end, doctor) for the
+        # ones long enough; callers stop early, so gaps after the answer are never looked at.
+        heap = []
+        for n, doctor in enumerate(self.doctors_by_specialty.get(specialty, ())):
+            gaps = doctor.free_gaps(after, working_hours, until)
+            gap = next(gaps, None)
+            if gap:
+                heap.append((gap[0], gap[1], n, doctor, gaps))
+        heapq.heapify(heap)
+
+        while heap:
+            start, end, n, doctor, gaps = heap[0]
+            if end - start >= duration:
+                yield start, end, doctor
+            gap = next(gaps, None)
+            if gap:
+                heapq.heapreplace(heap, (gap[0], gap[1], n, doctor, gaps))
+            else:
+                heapq.heappop(heap)
+
+    def schedule_waitlist(self, waitlist, optimize=False, working_hours=WORKING_HOURS,
+                          horizon=timedelta(days=90)):
+        """Book a whole waitlist in one pass and return a summary.
+
+        Entries are (patient_id, specialty, priority, earliest[, duration]); a lower priority
+        number is seen first. The default is greedy: each patient gets the earliest free slot.
+        With optimize=True, longer visits go first within a priority and each patient gets the
+        tightest-fitting gap on the earliest available day, keeping long gaps for long visits.
+        """
+        started = clock.perf_counter()
+        queue = []
+        for n, entry in enumerate(waitlist):
+            patient_id, specialty, priority, earliest = entry[:4]
+            duration = entry[4] if len(entry) > 4 else DEFAULT_DURATION
+            longest_first = -duration.total_seconds() if optimize else 0
+            queue.append((priority, longest_first, earliest, n, patient_id, specialty, duration))
+        heapq.heapify(queue)
+
+        booked, unassigned = [], []
+        free = {}  # specialty -> _FreeGaps, shared by every patient in the run
+        while queue:
+            _, _, earliest, _, patient_id, specialty, duration = heapq.heappop(queue)
+            patient = self.patients.get(patient_id)
+            appointment = None
+            if patient:
+                if specialty not in free:
+                    free[specialty] = _FreeGaps(self.doctors_by_specialty.get(specialty, []), working_hours)
+                gaps = free[specialty]
+                while appointment is None:
+                    found = gaps.find(earliest, duration, earliest + horizon, optimize)
+                    if found is None:
+                        break
+                    start, n = found
+                    appointment = self._book(gaps.doctors[n], patient, start, duration)
+                    if appointment:
+                        gaps.take(start, duration, n)
+                    else:
+                        gaps.refresh(start.date(), n)  # booked meanwhile; see what is left
+            if appointment:
+                booked.append(appointment)
+            else:
+                unassigned.append(patient_id)
+
+        return {
+            "booked": booked,
+            "unassigned": unassigned,
+            "utilization": self._utilization(booked, working_hours),
+            "seconds": clock.perf_counter() - started,
+        }
+
+    def _utilization(self, booked, working_hours):
+        """Booked share of the working time of the involved doctors on the days the run touched."""
+        if not booked:
+            return 0.0
+        doctors = {a.doctor.doctor_id: a.doctor for a in booked}
+        first_day = min(a.appointment_time for a in booked).date()
+        last_day = max(a.appointment_time for a in booked).date()
+        open_time, close_time = working_hours
+        day_length = datetime.combine(first_day, close_time) - datetime.combine(first_day, open_time)
+        available = day_length * ((last_day - first_day).days + 1) * len(doctors)
+        window_start = datetime.combine(first_day, open_time)
+        window_end = datetime.combine(last_day, close_time)
+        busy = timedelta()
+        for doctor in doctors.values():
+            for start, end in doctor.appointments_between(window_start, window_end):
+                busy += min(end, window_end) - max(start, window_start)
+        return busy / available
+
+    def cancel_appointment(self, appointment_id):
+        appointment = self.appointments.get(appointment_id)
+        if appointment is not None:
+            with appointment.doctor.lock:
+                # Re-checked under the lock: a concurrent cancel may have won
+                if self.appointments.remove(appointment_id) is None:
+                    appointment = None
+                else:
+                    appointment.doctor.remove_appointment(appointment.appointment_time, appointment.duration,
+                                                          appointment_id)
+                    self._record({"e": "cancel", "id": appointment_id})
+        if appointment is None:
+            print("Appointment not found.")
+            return False
+        print(f"🗑️ Cancelled {appointment}")
+        return True
+
+    def reschedule_appointment(self, appointment_id, new_time, duration=None):
+        appointment = self.appointments.get(appointment_id)
+        if appointment is None:
+            print("Appointment not found.")
+            return False
+        duration = duration or appointment.duration
+        with appointment.doctor.lock:
+            moved = appointment.doctor.move_appointment(appointment.appointment_time, appointment.duration,
+                                                        new_time, duration, appointment_id)
+            if moved:
+                self.appointments.move(appointment_id, new_time, duration)
+                self._record({"e": "move", "id": appointment_id, "time": new_time.isoformat(),
+                              "seconds": duration.total_seconds()})
+        if not moved:
+            print(f"❌ Doctor {appointment.doctor.name} is not available at {new_time}.")
+            return False
+        print(f"🔁 Rescheduled: {appointment}")
+        return True
+
+    # --- persistence ---
+    def snapshot(self):
+        """Fold the event log into a fresh snapshot now."""
+        with self._log_lock:
+            self._write_snapshot()
+
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+
+    def _record(self, event):
+        # Called with the doctor's lock held, right after the change is applied. A snapshot taken in
+        # between already contains the change, and replaying the event again is a no-op
+        if self._log is None:
+            return
+        line = json.dumps(event, separators=(",", ":")) + "\n"
+        with self._log_lock:
+            self._log.write(line)
+            self._log.flush()
+            if self.sync:
+                os.fsync(self._log.fileno())
+            self._logged_events += 1
+            if self._logged_events >= self.SNAPSHOT_EVERY:
+                self._write_snapshot()
+
+    def _write_snapshot(self):
+        appointments, next_id = self.appointments.snapshot()
+        data = {
+            "doctors": [[d.doctor_id, d.name, d.specialty] for d in list(self.doctors.values())],
+            "patients": [[p.patient_id, p.name, p.ailment] for p in list(self.patients.values())],
+            "next_id": next_id,
+            "appointments": [[a.appointment_id, a.doctor.doctor_id, a.patient.patient_id,
+                              a.appointment_time.isoformat(), a.duration.total_seconds()] for a in appointments],
+        }
+        snapshot_file = self.log_file + ".snapshot"
+        with open(snapshot_file + ".tmp", "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, separators=(",", ":")))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(snapshot_file + ".tmp", snapshot_file)
+        # Truncating is safe: the log handle is in append mode, so later writes start at the new end
+        with open(self.log_file, "w") as f:
+            os.fsync(f.fileno())
+        self._logged_events = 0
+
+    def _recover(self):
+        try:
+            with open(self.log_file + ".snapshot", encoding="utf-8") as f:
+                self._restore(json.load(f))
+        except FileNotFoundError:
+            pass
+        torn = False
+        try:
+            with open(self.log_file, encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        torn = True  # killed mid-append; that change was never acknowledged
+                        break
+                    self._replay(json.loads(line))
+                    self._logged_events += 1
+        except FileNotFoundError:
+            pass
+        if torn:
+            self._write_snapshot()
+
+    def _restore(self, data):
+        for doctor_id, name, specialty in data["doctors"]:
+            self.add_doctor(Doctor(doctor_id, name, specialty))
+        for patient_id, name, ailment in data["patients"]:
+            self.add_patient(Patient(patient_id, name, ailment))
+        appointments = []
+        for appointment_id, doctor_id, patient_id, start, seconds in data["appointments"]:
+            doctor = self.doctors[doctor_id]
+            start = datetime.fromisoformat(start)
+            appointment = Appointment(doctor, self.patients[patient_id], start, timedelta(seconds=seconds))
+            appointment.appointment_id = appointment_id
+            appointments.append(appointment)
+            doctor.schedule.append((start, appointment.end_time, appointment_id))
+        for doctor in self.doctors.values():
+            doctor.schedule.sort()
+        self.appointments.bulk_add(appointments, data["next_id"])
+
+    def _replay(self, event):
+        kind = event["e"]
+        if kind == "doctor":
+            if event["id"] not in self.doctors:
+                self.add_doctor(Doctor(event["id"], event["name"], event["specialty"]))
+        elif kind == "patient":
+            self.add_patient(Patient(event["id"], event["name"], event["ailment"]))
+        # Events the snapshot already covers (it was written, then the process died before the log
+        # was truncated) must change nothing: a booking whose slot is held again, by this or a later
+        # appointment, is skipped, and cancel/move only touch that appointment's own interval
+        elif kind == "book":
+            if self.appointments.get(event["id"]) is None:
+                doctor = self.doctors[event["doctor"]]
+                start, duration = datetime.fromisoformat(event["time"]), timedelta(seconds=event["seconds"])
+                if doctor.add_appointment(start, duration, event["id"]):
+                    self.appointments.add(Appointment(doctor, self.patients[event["patient"]], start, duration),
+                                          event["id"])
+        elif kind == "cancel":
+            appointment = self.appointments.remove(event["id"])
+            if appointment is not None:
+                appointment.doctor.remove_appointment(appointment.appointment_time, appointment.duration,
+                                                      event["id"])
+        elif kind == "move":
+            appointment = self.appointments.get(event["id"])
+            if appointment is not None:
+                start, duration = datetime.fromisoformat(event["time"]), timedelta(seconds=event["seconds"])
+                if appointment.doctor.move_appointment(appointment.appointment_time, appointment.duration,
+                                                       start, duration, event["id"]):
+                    self.appointments.move(event["id"], start, duration)
+
+    def appointments_on(self, day):
+        """Yield the appointments on a date, in time order."""
+        return self.appointments.on(day)
+
+    def appointments_for_patient(self, patient_id, start=None, end=None):
+        return self.appointments.for_patient(patient_id, start, end)
+
+    def appointments_for_doctor(self, doctor_id, start=None, end=None):
+        return self.appointments.for_doctor(doctor_id, start, end)
+
     def view_doctor_schedule(self, doctor_id):
         doctor = self.doctors.get(doctor_id)
         if not doctor:
@@ -90,18 +685,51 @@ class Hospital:
         if not doctor.schedule:
             print("No appointments scheduled.")
         else:
-            for time in sorted(doctor.schedule):
-                print(f" - {time.strftime('%Y-%m-%d %H:%M')}")
+            for start, end, _ in doctor.schedule:  # already in time order
+                print(f" - {start.strftime('%Y-%m-%d %H:%M')}-{end.strftime('%H:%M')}")
 
     def list_appointments(self):
         print(f"\nAll Appointments at {self.name}:")
         if not self.appointments:
             print("No appointments booked yet.")
         else:
-            for appointment in self.appointments:
+            for appointment in self.appointments:  # streamed in time order
                 print(appointment)
 
 
+async def _handle_booking_client(hospital, reader, writer):
+    # One JSON request per line: {"doctor_id", "patient_id", "time" (ISO), "minutes" (optional)}
+    try:
+        while line := await reader.readline():
+            try:
+                request = json.loads(line)
+                doctor = hospital.doctors.get(request["doctor_id"])
+                patient = hospital.patients.get(request["patient_id"])
+                if not doctor or not patient:
+                    reply = {"ok": False, "error": "Invalid doctor or patient ID."}
+                else:
+                    # Booking takes the doctor's lock and may fsync the log, so it runs on a worker
+                    # thread; the loop keeps serving other clients and only same-doctor bookings wait
+                    appointment = await asyncio.to_thread(hospital._book, doctor, patient,
+                                                          datetime.fromisoformat(request["time"]),
+                                                          timedelta(minutes=request.get("minutes", 30)))
+                    reply = {"ok": appointment is not None}
+            except (ValueError, KeyError, TypeError) as e:
+                reply = {"ok": False, "error": str(e)}
+            writer.write((json.dumps(reply) + "\n").encode())
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_bookings(hospital, host="127.0.0.1", port=8765):
+    """Start a local booking server; many clients can book concurrently over one event loop."""
+    return await asyncio.start_server(
+        lambda reader, writer: _handle_booking_client(hospital, reader, writer), host, port)
+
+
 # Example usage
 if __name__ == "__main__":
     hospital = Hospital("CityCare Hospital")
@@ -122,9 +750,36 @@ if __name__ == "__main__":
 
     # Book appointments
     appt_time1 = datetime(2025, 10, 16, 10, 0)
-    appt_time2 = datetime(2025, 10, 16, 10, 0)  # same time (to test double booking)
+    appt_time2 = datetime(2025, 10, 16, 10, 15)  # overlaps the first slot (to test double booking)
     appt_time3 = datetime(2025, 10, 16, 11, 0)
 
+    hospital.book_appointment(1, 101, appt_time1)
+    hospital.book_appointment(1, 102, appt_time2)
+    hospital.book_appointment(1, 102, appt_time3, timedelta(minutes=45))
+    hospital.book_appointment(2, 102, appt_time2)
+
+    # Earliest free cardiology slot after the morning's bookings
+    doctor, start = hospital.find_earliest_slot("Cardiology", appt_time1, timedelta(hours=1))
+    print(f"Earliest free hour in Cardiology: {doctor} at {start.strftime('%Y-%m-%d %H:%M')}")
+
+    # Fill the remaining cardiology time from a small waitlist, most urgent first
+    hospital.add_patient(Patient(103, "Sam Poe", "Palpitations"))
+    hospital.add_patient(Patient(104, "Ann Lee", "Follow-up"))
+    result = hospital.schedule_waitlist([
+        (104, "Cardiology", 2, appt_time1, timedelta(minutes=15)),
+        (103, "Cardiology", 1, appt_time1, timedelta(hours=1)),
+    ], optimize=True)
+    print(f"Waitlist: {len(result['booked'])} booked, {len(result['unassigned'])} unassigned, "
+          f"utilization {result['utilization']:.0%}")
+
+    # Move John's appointment, then look up the day's agenda and Jane's history
+    first = next(hospital.appointments_for_patient(101))
+    hospital.reschedule_appointment(first.appointment_id, datetime(2025, 10, 16, 14, 0))
+    print("\nAgenda for 2025-10-16:")
+    for appointment in hospital.appointments_on(appt_time1.date()):
+        print(appointment)
+    print(f"\nJane Roe has {sum(1 for _ in hospital.appointments_for_patient(102))} appointments")
+
     # View schedules
     hospital.view_doctor_schedule(1)
     hospital.view_doctor_schedule(2)
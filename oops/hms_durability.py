@@ -0,0 +1,256 @@
+# Durability checks for the Hospital event log in hms.py
+#
+#   python hms_durability.py bench --appointments 1000000   # log replay vs snapshot load
+#   python hms_durability.py crash --rounds 20               # SIGKILL a writer, reopen, verify
+#   python hms_durability.py window --rounds 200             # die between snapshot and log truncate
+#
+# The crash test runs a child process that books and cancels with sync=True and reports every
+# acknowledged change on stdout; the parent kills it at a random moment and checks that nothing
+# acknowledged was lost and that the recovered schedules are consistent.
+#
+# Random kills almost never land in the few instructions between replacing the snapshot and
+# truncating the log, so the window test builds that state directly: it saves the log, takes a
+# snapshot, puts the old log back and reopens. Every event in that log is already in the snapshot,
+# and replaying them must leave the state exactly as it was.
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from hms import Doctor, Hospital, Patient
+
+START = datetime(2025, 10, 16, 9, 0)
+SLOT = timedelta(minutes=30)
+
+
+def populate(hospital, doctors, patients, appointments):
+    for i in range(doctors):
+        hospital.add_doctor(Doctor(i, f"Doctor {i}", ["General", "Cardiology", "Dermatology"][i % 3]))
+    for i in range(patients):
+        hospital.add_patient(Patient(i, f"Patient {i}", "Checkup"))
+    # Fill each doctor's day slot by slot, so every booking succeeds
+    for n in range(appointments):
+        doctor, slot = n % doctors, n // doctors
+        day, index = divmod(slot, 16)
+        start = START + timedelta(days=day, minutes=30 * index)
+        hospital._book(hospital.doctors[doctor], hospital.patients[n % patients], start, SLOT)
+
+
+def file_mb(path):
+    return os.path.getsize(path) / (1024 * 1024) if os.path.exists(path) else 0.0
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def bench(args):
+    with tempfile.TemporaryDirectory() as workdir:
+        log_file = os.path.join(workdir, "hospital.log")
+        Hospital.SNAPSHOT_EVERY = args.appointments * 2  # keep everything in the log for the replay run
+        hospital = Hospital("Bench Hospital", log_file, sync=False)
+        _, elapsed = timed(lambda: populate(hospital, args.doctors, args.patients, args.appointments))
+        hospital.close()
+        print(f"write: {args.appointments} appointments logged in {elapsed:.2f}s "
+              f"({args.appointments / elapsed:.0f}/s), log {file_mb(log_file):.1f} MB")
+
+        hospital, elapsed = timed(lambda: Hospital("Bench Hospital", log_file, sync=False))
+        print(f"replay log: {elapsed:.2f}s ({len(hospital.appointments)} appointments)")
+
+        _, elapsed = timed(hospital.snapshot)
+        hospital.close()
+        print(f"snapshot: written in {elapsed:.2f}s, {file_mb(log_file + '.snapshot'):.1f} MB")
+
+        hospital, elapsed = timed(lambda: Hospital("Bench Hospital", log_file, sync=False))
+        hospital.close()
+        print(f"load snapshot: {elapsed:.2f}s ({len(hospital.appointments)} appointments)")
+
+        hospital = Hospital("Bench Hospital", log_file, sync=True)
+        doctor, patient = hospital.doctors[0], hospital.patients[0]
+        samples = 200
+        far = START + timedelta(days=3650)
+        _, elapsed = timed(lambda: [hospital._book(doctor, patient, far + i * SLOT, SLOT) for i in range(samples)])
+        hospital.close()
+        print(f"synced booking: {elapsed / samples * 1000:.2f} ms each")
+
+
+def child(log_file, seed):
+    Hospital.SNAPSHOT_EVERY = 50  # snapshot often so kills also land during compaction
+    hospital = Hospital("Crash Hospital", log_file)
+    if not hospital.doctors:
+        for i in range(4):
+            hospital.add_doctor(Doctor(i, f"Doctor {i}", "General"))
+        for i in range(20):
+            hospital.add_patient(Patient(i, f"Patient {i}", "Checkup"))
+    rng = random.Random(seed)
+    quiet = io.StringIO()  # cancel_appointment prints; only the protocol lines go to the parent
+    while True:
+        booked = [a.appointment_id for a in hospital.appointments]
+        if booked and rng.random() < 0.3:
+            appointment_id = rng.choice(booked)
+            print(f"X {appointment_id}", flush=True)
+            with contextlib.redirect_stdout(quiet):
+                hospital.cancel_appointment(appointment_id)
+            print(f"C {appointment_id}", flush=True)
+            continue
+        doctor = hospital.doctors[rng.randrange(4)]
+        start = START + timedelta(minutes=15 * rng.randrange(400))
+        appointment = hospital._book(doctor, hospital.patients[rng.randrange(20)], start, SLOT)
+        if appointment:
+            print(f"B {appointment.appointment_id}", flush=True)
+
+
+def check(hospital, acknowledged, attempted_cancel, cancelled):
+    problems = []
+    stored = {a.appointment_id for a in hospital.appointments}
+    for appointment_id in acknowledged - attempted_cancel:
+        if appointment_id not in stored:
+            problems.append(f"acknowledged booking {appointment_id} was lost")
+    for appointment_id in cancelled & stored:
+        problems.append(f"acknowledged cancellation {appointment_id} came back")
+    for doctor in hospital.doctors.values():
+        for (_, end, _), (next_start, _, _) in zip(doctor.schedule, doctor.schedule[1:]):
+            if next_start < end:
+                problems.append(f"{doctor}: overlapping appointments at {next_start}")
+        expected = sorted((a.appointment_time, a.end_time, a.appointment_id) for a in hospital.appointments
+                          if a.doctor is doctor)
+        if expected != doctor.schedule:
+            problems.append(f"{doctor}: schedule does not match stored appointments")
+    return problems
+
+
+def crash(args):
+    rng = random.Random(args.seed)
+    acknowledged, attempted_cancel, cancelled = set(), set(), set()
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        log_file = os.path.join(workdir, "hospital.log")
+        for round_number in range(1, args.rounds + 1):
+            proc = subprocess.Popen([sys.executable, __file__, "_child", log_file, str(rng.randrange(1 << 30))],
+                                    stdout=subprocess.PIPE, text=True)
+            time.sleep(rng.uniform(0.05, args.max_wait))
+            proc.send_signal(signal.SIGKILL)
+            output, _ = proc.communicate()
+            for line in output.splitlines():
+                kind, _, value = line.partition(" ")
+                if kind == "B":
+                    acknowledged.add(int(value))
+                elif kind == "X":
+                    attempted_cancel.add(int(value))
+                elif kind == "C":
+                    cancelled.add(int(value))
+
+            hospital = Hospital("Crash Hospital", log_file)
+            problems = check(hospital, acknowledged, attempted_cancel, cancelled)
+            # Whatever survived is the new truth for the next round
+            stored = {a.appointment_id for a in hospital.appointments}
+            acknowledged &= stored
+            attempted_cancel &= stored
+            hospital.close()
+            failed = failed or bool(problems)
+            print(f"round {round_number}: {len(output.splitlines())} acknowledged changes, "
+                  f"{len(stored)} appointments recovered, {'OK' if not problems else 'FAILED'}")
+            for problem in problems[:20]:
+                print(f"  - {problem}")
+    sys.exit(1 if failed else 0)
+
+
+def state(hospital):
+    return {a.appointment_id: (a.doctor.doctor_id, a.patient.patient_id, a.appointment_time, a.duration)
+            for a in hospital.appointments}
+
+
+def window_history(hospital, rng, events):
+    # The reported case first (book, cancel, book the same slot again), then random changes on a
+    # small grid so freed slots are soon taken by other appointments
+    doctors, patients = list(hospital.doctors.values()), list(hospital.patients.values())
+    first = hospital._book(doctors[0], patients[0], START, SLOT)
+    hospital.cancel_appointment(first.appointment_id)
+    hospital._book(doctors[0], patients[1], START, SLOT)
+    for _ in range(events):
+        booked = [a.appointment_id for a in hospital.appointments]
+        start = START + timedelta(minutes=15 * rng.randrange(16))
+        roll = rng.random()
+        if booked and roll < 0.3:
+            hospital.cancel_appointment(rng.choice(booked))
+        elif booked and roll < 0.5:
+            hospital.reschedule_appointment(rng.choice(booked), start)
+        else:
+            hospital._book(rng.choice(doctors), rng.choice(patients), start, SLOT)
+
+
+def window(args):
+    rng = random.Random(args.seed)
+    quiet = io.StringIO()  # cancel and reschedule print
+    failed = False
+    for round_number in range(1, args.rounds + 1):
+        with tempfile.TemporaryDirectory() as workdir:
+            log_file = os.path.join(workdir, "hospital.log")
+            hospital = Hospital("Window Hospital", log_file, sync=False)
+            for i in range(2):
+                hospital.add_doctor(Doctor(i, f"Doctor {i}", "General"))
+            for i in range(5):
+                hospital.add_patient(Patient(i, f"Patient {i}", "Checkup"))
+            with contextlib.redirect_stdout(quiet):
+                window_history(hospital, rng, rng.randrange(args.events + 1))
+            expected = state(hospital)
+            with open(log_file, "rb") as f:
+                log = f.read()
+            hospital.snapshot()
+            hospital.close()
+            with open(log_file, "wb") as f:
+                f.write(log)
+
+            hospital = Hospital("Window Hospital", log_file, sync=False)
+            problems = check(hospital, set(), set(), set())
+            if state(hospital) != expected:
+                problems.append("recovered appointments differ from the ones in the snapshot")
+            hospital.close()
+        if problems:
+            failed = True
+            print(f"round {round_number}: FAILED")
+            for problem in problems[:20]:
+                print(f"  - {problem}")
+    print(f"{args.rounds} rounds: {'FAILED' if failed else 'OK'}")
+    sys.exit(1 if failed else 0)
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "_child":
+        child(sys.argv[2], int(sys.argv[3]))
+        return
+    parser = argparse.ArgumentParser(description="Benchmark and crash-test the Hospital event log.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    bench_parser = commands.add_parser("bench", help="time log replay against snapshot load")
+    bench_parser.add_argument("--appointments", type=int, default=1_000_000)
+    bench_parser.add_argument("--doctors", type=int, default=200)
+    bench_parser.add_argument("--patients", type=int, default=50_000)
+    crash_parser = commands.add_parser("crash", help="kill a writer at random points and verify recovery")
+    crash_parser.add_argument("--rounds", type=int, default=20)
+    crash_parser.add_argument("--max-wait", type=float, default=0.5, help="longest a child runs before SIGKILL")
+    crash_parser.add_argument("--seed", type=int, default=7)
+    window_parser = commands.add_parser("window", help="reopen after dying between snapshot and log truncate")
+    window_parser.add_argument("--rounds", type=int, default=200)
+    window_parser.add_argument("--events", type=int, default=60, help="most changes before the snapshot")
+    window_parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    if args.command == "bench":
+        bench(args)
+    elif args.command == "window":
+        window(args)
+    else:
+        crash(args)
+
+
+if __name__ == "__main__":
+    main()
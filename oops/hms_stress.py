@@ -0,0 +1,132 @@
+# Stress test for concurrent booking in hms.py
+# Many threads and many asyncio clients race for the same few doctors' slots; afterwards every
+# schedule is checked for overlaps and against the appointments that were reported as booked.
+#
+#   python hms_stress.py --threads 32 --clients 64 --requests 2000
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from hms import Doctor, Hospital, Patient, serve_bookings
+
+START = datetime(2025, 10, 16, 9, 0)
+MINUTES = [15, 30, 45, 60]
+
+
+def make_hospital(doctors, patients):
+    hospital = Hospital("Stress Test Hospital")
+    for i in range(doctors):
+        hospital.add_doctor(Doctor(i, f"Doctor {i}", "General"))
+    for i in range(patients):
+        hospital.add_patient(Patient(i, f"Patient {i}", "Checkup"))
+    return hospital
+
+
+def random_request(rng, args):
+    # Slots on a 15-minute grid over a few days, so lots of requests collide
+    start = START + timedelta(minutes=15 * rng.randrange(args.days * 32))
+    return rng.randrange(args.doctors), rng.randrange(args.patients), start, rng.choice(MINUTES)
+
+
+def run_threads(hospital, args):
+    booked = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(args.requests):
+            doctor_id, patient_id, start, minutes = random_request(rng, args)
+            if hospital.book_appointment(doctor_id, patient_id, start, timedelta(minutes=minutes)):
+                booked.append((doctor_id, start, minutes))
+
+    threads = [threading.Thread(target=worker, args=(args.seed + i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return booked, args.threads * args.requests, time.perf_counter() - started
+
+
+async def run_clients(hospital, args):
+    server = await serve_bookings(hospital, port=0)
+    port = server.sockets[0].getsockname()[1]
+    booked = []
+
+    async def client(seed):
+        rng = random.Random(seed)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for _ in range(args.requests):
+            doctor_id, patient_id, start, minutes = random_request(rng, args)
+            request = {"doctor_id": doctor_id, "patient_id": patient_id, "time": start.isoformat(),
+                       "minutes": minutes}
+            writer.write((json.dumps(request) + "\n").encode())
+            await writer.drain()
+            if json.loads(await reader.readline())["ok"]:
+                booked.append((doctor_id, start, minutes))
+        writer.close()
+        await writer.wait_closed()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(args.seed + 10_000 + i) for i in range(args.clients)))
+    elapsed = time.perf_counter() - started
+    server.close()
+    await server.wait_closed()
+    return booked, args.clients * args.requests, elapsed
+
+
+def check(hospital, booked):
+    """Return a list of problems; empty means no double booking and nothing lost."""
+    problems = []
+    expected = {}
+    for doctor_id, start, minutes in booked:
+        expected.setdefault(doctor_id, []).append((start, start + timedelta(minutes=minutes)))
+    for doctor in hospital.doctors.values():
+        slots = [(start, end) for start, end, _ in doctor.schedule]
+        for (_, end), (next_start, _) in zip(slots, slots[1:]):
+            if next_start < end:
+                problems.append(f"{doctor}: overlapping appointments at {next_start}")
+        if sorted(expected.get(doctor.doctor_id, [])) != slots:
+            problems.append(f"{doctor}: schedule does not match the bookings that succeeded")
+    if len(hospital.appointments) != len(booked):
+        problems.append(f"{len(hospital.appointments)} appointments stored, {len(booked)} reported booked")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hammer Hospital.book_appointment concurrently.")
+    parser.add_argument("--doctors", type=int, default=8)
+    parser.add_argument("--patients", type=int, default=500)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--clients", type=int, default=32, help="concurrent asyncio socket clients")
+    parser.add_argument("--requests", type=int, default=1000, help="booking attempts per thread/client")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    failed = False
+    for mode in ("threads", "asyncio"):
+        hospital = make_hospital(args.doctors, args.patients)
+        with contextlib.redirect_stdout(io.StringIO()):  # book_appointment prints every attempt
+            if mode == "threads":
+                booked, attempts, elapsed = run_threads(hospital, args)
+            else:
+                booked, attempts, elapsed = asyncio.run(run_clients(hospital, args))
+        problems = check(hospital, booked)
+        failed = failed or bool(problems)
+        print(f"{mode}: {attempts} attempts, {len(booked)} booked, {attempts / elapsed:.0f} requests/sec, "
+              f"{len(booked) / elapsed:.0f} bookings/sec, {'OK' if not problems else 'FAILED'}")
+        for problem in problems[:20]:
+            print(f"  - {problem}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
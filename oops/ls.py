@@ -1,11 +1,40 @@
+import heapq
 import json
-from datetime import datetime, timedelta
-import tkinter as tk
-from tkinter import messagebox, ttk
+import mmap
+import os
+import queue
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, insort
+from collections.abc import Mapping
+from contextlib import contextmanager
+from itertools import chain, compress
+from datetime import date, datetime, timedelta
+
+# Tk is only needed by LibraryApp; it is imported on first use so the Library core
+# stays importable (and quick to import) on headless machines. sqlite3 and csv are
+# deferred the same way, to SQLiteLibrary and import_csv().
+tk = messagebox = ttk = None
+
+
+def _load_tk():
+    global tk, messagebox, ttk
+    if tk is None:
+        import tkinter
+        from tkinter import messagebox as tk_messagebox, ttk as tk_ttk
+        tk, messagebox, ttk = tkinter, tk_messagebox, tk_ttk
 
 
 # ---------- Book Class ----------
 class Book:
+    __slots__ = ("book_id", "title", "author", "available")
+
     def __init__(self, book_id, title, author, available=True):
         self.book_id = book_id
         self.title = title
@@ -27,6 +56,8 @@ class Book:
 
 # ---------- Borrower Class ----------
 class Borrower:
+    __slots__ = ("user_id", "name", "borrowed_books")
+
     def __init__(self, user_id, name, borrowed_books=None):
         self.user_id = user_id
         self.name = name
@@ -50,81 +81,481 @@ class Borrower:
 
     @staticmethod
     def from_dict(data):
-        return Borrower(data["user_id"], data["name"], data["borrowed_books"])
+        # JSON object keys are always strings; book ids are ints everywhere else
+        borrowed_books = {int(k): v for k, v in data["borrowed_books"].items()}
+        return Borrower(data["user_id"], data["name"], borrowed_books)
 
 
-# ---------- Library Class ----------
-class Library:
-    PENALTY_PER_DAY = 10
-    DATA_FILE = "library_data.json"
+# ---------- Storage Helpers ----------
+def _fsync_dir(path):
+    # Make an os.replace() durable; not every platform lets you open a directory
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
-    def __init__(self):
-        self.books = {}
-        self.borrowers = {}
-        self.load_data()
 
-    def save_data(self):
+class JournalWriter:
+    """Appends journal lines from a background thread, one fsync per group of records.
+
+    A record handed to append() is on disk within roughly max_delay seconds plus one fsync.
+    """
+
+    def __init__(self, path, max_delay=0.05, max_batch=500):
+        self.path = path
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._error = None
+        self._closed = False
+        self._file = open(path, "a")  # here rather than on the thread, so a bad path fails the caller
+        self._thread = threading.Thread(target=self._run, name="library-journal", daemon=True)
+        self._thread.start()
+
+    def append(self, line):
+        self._check()
+        self._queue.put(line)
+
+    def run(self, task):
+        """Call task() on the writer thread once everything appended before it is fsynced."""
+        self._check()
+        self._queue.put(task)
+
+    def flush(self):
+        """Block until everything appended so far is fsynced."""
+        self._check()
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(0.1):
+            self._check()  # the thread died before reaching this group
+        self._check()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        elif not self._error:
+            self._error = RuntimeError("journal writer thread stopped unexpectedly")
+        if self._error:
+            raise self._error
+
+    def _check(self):
+        if self._error:
+            raise self._error
+        if not self._thread.is_alive():
+            raise RuntimeError("journal writer is closed" if self._closed else
+                               "journal writer thread stopped unexpectedly")
+
+    def _run(self):
+        with self._file as f:
+            running = True
+            while running:
+                lines, waiters, task = [], [], None
+                item = self._queue.get()
+                deadline = time.monotonic() + self.max_delay
+                while True:
+                    if item is None:
+                        running = False
+                        break
+                    if isinstance(item, threading.Event):
+                        waiters.append(item)
+                        break  # someone is waiting on this group; don't hold it open
+                    if callable(item):
+                        task = item
+                        break  # the task must see this group on disk
+                    lines.append(item)
+                    if len(lines) >= self.max_batch:
+                        break
+                    try:
+                        item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                if lines and not self._error:
+                    try:
+                        f.write("".join(lines))
+                        f.flush()
+                        os.fsync(f.fileno())
+                    except OSError as e:
+                        self._error = e
+                if task and not self._error:
+                    try:
+                        task()
+                    except Exception as e:
+                        self._error = e
+                for waiter in waiters:
+                    waiter.set()
+
+
+# Binary snapshot layout (little-endian):
+#   header  magic, version, reserved, crc32 of everything after the header, book count,
+#           byte lengths of the title, author and borrower sections
+#   int64   book ids (ascending), then uint64 title offsets and author offsets (count + 1 each)
+#   uint8   availability flag per book
+#   utf-8   all titles, all authors, then the borrowers as compact JSON (they are few and mutable)
+SNAPSHOT_MAGIC = b"LIBS"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<4sHHIIQQQ")
+
+
+def _encoded(book):
+    return book.title.encode("utf-8"), book.author.encode("utf-8"), book.available
+
+
+def write_binary_snapshot(path, books, borrowers, available_ids=None):
+    """Write books (Books, a book_id -> Book mapping or a SnapshotBooks) and borrowers.
+
+    available_ids, if given, overrides each Book's own flag.
+    """
+    if sys.byteorder != "little":
+        raise ValueError("binary snapshots are only supported on little-endian machines")
+    if isinstance(books, SnapshotBooks):
+        rows = books.encoded_rows()
+    else:
+        if isinstance(books, Mapping):
+            books = books.values()
+        rows = ((book.book_id, *_encoded(book)) for book in sorted(books, key=lambda b: b.book_id))
+    if available_ids is not None:
+        available_ids = set(available_ids)
+    ids, title_offsets, author_offsets = array("q"), array("Q", [0]), array("Q", [0])
+    available, titles, authors = bytearray(), bytearray(), bytearray()
+    for book_id, title, author, flag in rows:
+        ids.append(book_id)
+        available.append(flag if available_ids is None else book_id in available_ids)
+        titles += title
+        title_offsets.append(len(titles))
+        authors += author
+        author_offsets.append(len(authors))
+    borrower_json = json.dumps([b.to_dict() for b in borrowers], separators=(",", ":")).encode("utf-8")
+
+    sections = [ids.tobytes(), title_offsets.tobytes(), author_offsets.tobytes(),
+                available, titles, authors, borrower_json]
+    crc = 0
+    for section in sections:
+        crc = zlib.crc32(section, crc)
+    with open(path, "wb") as f:
+        f.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, crc, len(books),
+                                      len(titles), len(authors), len(borrower_json)))
+        for section in sections:
+            f.write(section)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_binary_snapshot(path):
+    """Map a binary snapshot; returns (SnapshotBooks, {user_id: Borrower})."""
+    if sys.byteorder != "little":
+        raise ValueError("binary snapshots are only supported on little-endian machines")
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    if len(view) < _SNAPSHOT_HEADER.size:
+        raise ValueError(f"{path}: truncated snapshot")
+    magic, version, _, crc, count, titles_len, authors_len, borrowers_len = _SNAPSHOT_HEADER.unpack_from(view)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: not a version {SNAPSHOT_VERSION} library snapshot")
+    if zlib.crc32(view[_SNAPSHOT_HEADER.size:]) != crc:
+        raise ValueError(f"{path}: snapshot checksum mismatch")
+
+    sizes = [8 * count, 8 * (count + 1), 8 * (count + 1), count, titles_len, authors_len, borrowers_len]
+    sections, pos = [], _SNAPSHOT_HEADER.size
+    for size in sizes:
+        sections.append(view[pos:pos + size])
+        pos += size
+    ids, title_offsets, author_offsets, available, titles, authors, borrower_json = sections
+    books = SnapshotBooks(ids.cast("q"), title_offsets.cast("Q"), author_offsets.cast("Q"),
+                          available, titles, authors)
+    borrowers = {}
+    for data in json.loads(str(borrower_json, "utf-8")):
+        borrower = Borrower.from_dict(data)
+        borrowers[borrower.user_id] = borrower
+    return books, borrowers
+
+
+class SnapshotBooks(Mapping):
+    """book_id -> Book over a mapped binary snapshot; each Book is decoded on first access."""
+
+    def __init__(self, ids, title_offsets, author_offsets, available, titles, authors):
+        self._ids = ids
+        self._title_offsets = title_offsets
+        self._author_offsets = author_offsets
+        self._available_flags = available
+        self._titles = titles
+        self._authors = authors
+        self._loaded = {}  # decoded or replaced Books
+        self._added = {}  # ids that are not in the snapshot at all, in insertion order
+
+    def _position(self, book_id):
+        pos = bisect_left(self._ids, book_id)
+        if pos < len(self._ids) and self._ids[pos] == book_id:
+            return pos
+        return None
+
+    def __getitem__(self, book_id):
+        book = self._loaded.get(book_id)
+        if book is None:
+            pos = self._position(book_id)
+            if pos is None:
+                raise KeyError(book_id)
+            t = self._title_offsets
+            a = self._author_offsets
+            book = Book(book_id, str(self._titles[t[pos]:t[pos + 1]], "utf-8"),
+                        str(self._authors[a[pos]:a[pos + 1]], "utf-8"), bool(self._available_flags[pos]))
+            self._loaded[book_id] = book
+        return book
+
+    def __setitem__(self, book_id, book):
+        if book_id not in self._loaded and self._position(book_id) is None:
+            self._added[book_id] = None
+        self._loaded[book_id] = book
+
+    def __contains__(self, book_id):
+        return book_id in self._loaded or self._position(book_id) is not None
+
+    def __iter__(self):
+        yield from self._ids
+        yield from self._added
+
+    def __len__(self):
+        return len(self._ids) + len(self._added)
+
+    def copy(self):
+        """Another view of the same mapped columns; books added or replaced later are not in it."""
+        books = SnapshotBooks(self._ids, self._title_offsets, self._author_offsets, self._available_flags,
+                              self._titles, self._authors)
+        books._loaded = dict(self._loaded)
+        books._added = dict(self._added)
+        return books
+
+    def encoded_rows(self):
+        """(book_id, utf-8 title, utf-8 author, available) in id order, without decoding a Book.
+
+        Rows never accessed since the file was mapped are sliced straight from its columns.
+        """
+        added = [(book_id, *_encoded(self._loaded[book_id])) for book_id in sorted(self._added)]
+        if added and len(self._ids) and added[0][0] < self._ids[-1]:
+            return heapq.merge(self._mapped_rows(), added)  # ids are unique, so only they are compared
+        return chain(self._mapped_rows(), added)
+
+    def _mapped_rows(self):
+        t, a, loaded = self._title_offsets, self._author_offsets, self._loaded
+        for pos, book_id in enumerate(self._ids):
+            book = loaded.get(book_id)
+            if book is None:
+                yield (book_id, self._titles[t[pos]:t[pos + 1]], self._authors[a[pos]:a[pos + 1]],
+                       self._available_flags[pos])
+            else:
+                yield book_id, *_encoded(book)
+
+    def available_ids(self):
+        # Straight off the flag column, without decoding any Book
+        return compress(self._ids, self._available_flags)
+
+
+def convert_snapshot(src, dst):
+    """Convert between the JSON and binary snapshot layouts, chosen by file extension."""
+    if src.endswith(".json"):
+        with open(src, "r") as f:
+            data = json.load(f)
+        write_binary_snapshot(dst, [Book.from_dict(b) for b in data["books"]],
+                              [Borrower.from_dict(u) for u in data["borrowers"]])
+    else:
+        books, borrowers = read_binary_snapshot(src)
         data = {
-            "books": [book.to_dict() for book in self.books.values()],
-            "borrowers": [borrower.to_dict() for borrower in self.borrowers.values()]
+            "books": [book.to_dict() for book in books.values()],
+            "borrowers": [borrower.to_dict() for borrower in borrowers.values()]
         }
-        with open(self.DATA_FILE, "w") as f:
-            json.dump(data, f, indent=4)
+        with open(dst, "w") as f:
+            f.write(json.dumps(data, separators=(",", ":")))
 
-    def load_data(self):
-        try:
-            with open(self.DATA_FILE, "r") as f:
-                data = json.load(f)
-            self.books = {b["book_id"]: Book.from_dict(b) for b in data["books"]}
-            self.borrowers = {u["user_id"]: Borrower.from_dict(u) for u in data["borrowers"]}
-        except FileNotFoundError:
-            pass
+
+def _ordinal(value):
+    # Accepts a "%Y-%m-%d" string, a date/datetime, or None for today
+    if value is None:
+        return date.today().toordinal()
+    if isinstance(value, str):
+        return date.fromisoformat(value).toordinal()
+    if isinstance(value, int):
+        return value
+    return value.toordinal()
+
+
+def _clean_book_row(row):
+    if isinstance(row, dict):
+        title, author = row["title"], row["author"]
+    else:
+        title, author = row
+    title, author = (title or "").strip(), (author or "").strip()
+    if not title or not author:
+        raise ValueError("title and author are required")
+    return title, author
+
+
+def _clean_borrower_row(row):
+    name = row["name"] if isinstance(row, dict) else row
+    name = (name or "").strip()
+    if not name:
+        raise ValueError("name is required")
+    return name
+
+
+def _title_words(title):
+    return set(re.findall(r"\w+", title.lower()))
+
+
+def _discard_from(index, key, book_id):
+    # Returns True when the key's last id is removed and the key is dropped
+    ids = index.get(key)
+    if ids is None:
+        return False
+    ids.discard(book_id)
+    if not ids:
+        del index[key]
+        return True
+    return False
+
+
+# ---------- Library Base Class ----------
+class BaseLibrary(ABC):
+    """Lending rules shared by every storage backend; subclasses decide where the data lives."""
+    PENALTY_PER_DAY = 10
+    BATCH_SIZE = 5000  # rows validated and committed together by the bulk ingest methods
+
+    @abstractmethod
+    def _add_book_batch(self, rows):
+        """Store (title, author) pairs under fresh ids in one commit."""
+
+    @abstractmethod
+    def _add_borrower_batch(self, names):
+        """Store borrower names under fresh ids in one commit."""
+
+    @abstractmethod
+    def get_book(self, book_id):
+        pass
+
+    @abstractmethod
+    def get_borrower(self, user_id):
+        pass
+
+    @abstractmethod
+    def get_available_books(self, offset=0, limit=None):
+        pass
+
+    @abstractmethod
+    def count_available_books(self):
+        pass
+
+    @abstractmethod
+    def search(self, title=None, author=None, available_only=False):
+        pass
+
+    @abstractmethod
+    def list_overdue(self, as_of=None):
+        pass
+
+    @abstractmethod
+    def _lend(self, borrower, book):
+        """Persist the loan that borrower.borrow_book() just recorded."""
+
+    @abstractmethod
+    def _take_back(self, borrower, book):
+        """End the loan and return its due date string, or None if there was no such loan."""
+
+    def save_data(self):
+        pass
 
     def add_book(self, title, author):
-        book_id = len(self.books) + 1
-        self.books[book_id] = Book(book_id, title, author)
-        self.save_data()
+        self._add_book_batch([(title, author)])
         return f"Book '{title}' added successfully!"
 
     def add_borrower(self, name):
-        user_id = len(self.borrowers) + 1
-        self.borrowers[user_id] = Borrower(user_id, name)
-        self.save_data()
+        self._add_borrower_batch([name])
         return f"Borrower '{name}' added successfully!"
 
+    def add_books(self, rows, batch_size=None):
+        """Add (title, author) pairs or {"title", "author"} dicts; returns (added, rejected)."""
+        return self._ingest(rows, _clean_book_row, self._add_book_batch, batch_size)
+
+    def add_borrowers(self, rows, batch_size=None):
+        """Add names or {"name"} dicts; returns (added, rejected)."""
+        return self._ingest(rows, _clean_borrower_row, self._add_borrower_batch, batch_size)
+
+    def _ingest(self, rows, clean, add_batch, batch_size):
+        # rejected holds (row number, row, reason); invalid rows never reach storage
+        batch_size = batch_size or self.BATCH_SIZE
+        added, rejected, batch = 0, [], []
+        for row_no, row in enumerate(rows, 1):
+            try:
+                batch.append(clean(row))
+            except (ValueError, TypeError, KeyError, AttributeError) as e:
+                rejected.append((row_no, row, str(e)))
+                continue
+            if len(batch) >= batch_size:
+                add_batch(batch)
+                added += len(batch)
+                batch = []
+        if batch:
+            add_batch(batch)
+            added += len(batch)
+        return added, rejected
+
+    def import_csv(self, path, kind="books", batch_size=None):
+        """Stream a CSV with a header row (title,author for books; name for borrowers)."""
+        import csv
+        add_rows = self.add_books if kind == "books" else self.add_borrowers
+        start = time.perf_counter()
+        with open(path, newline="", encoding="utf-8") as f:
+            added, rejected = add_rows(csv.DictReader(f), batch_size)
+        seconds = time.perf_counter() - start
+        return {
+            "added": added,
+            "rejected": rejected,
+            "seconds": seconds,
+            "rows_per_sec": (added + len(rejected)) / seconds if seconds else 0.0,
+        }
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
     def borrow_book(self, user_id, book_id):
-        if user_id not in self.borrowers:
+        borrower = self.get_borrower(user_id)
+        if borrower is None:
             return False, "Borrower not found!"
-        if book_id not in self.books:
+        book = self.get_book(book_id)
+        if book is None:
             return False, "Book not found!"
 
-        borrower = self.borrowers[user_id]
-        book = self.books[book_id]
-
         if not book.available:
             return False, f"'{book.title}' is already borrowed!"
 
         due_date = datetime.now() + timedelta(days=14)
-        book.available = False
         success, msg = borrower.borrow_book(book, due_date)
-        self.save_data()
+        if success:
+            self._lend(borrower, book)
         return success, msg
 
     def return_book(self, user_id, book_id):
-        if user_id not in self.borrowers or book_id not in self.books:
+        borrower = self.get_borrower(user_id)
+        book = self.get_book(book_id)
+        if borrower is None or book is None:
             return False, "Invalid borrower or book ID!"
 
-        borrower = self.borrowers[user_id]
-        book = self.books[book_id]
-        due_date_str = borrower.return_book(book_id)
+        due_date_str = self._take_back(borrower, book)
 
         if not due_date_str:
             return False, f"{borrower.name} did not borrow '{book.title}'."
 
-        book.available = True
         due_date = datetime.strptime(due_date_str, "%Y-%m-%d")
         penalty = self.calculate_penalty(due_date)
-        self.save_data()
 
         if penalty > 0:
             return True, f"Book returned late! Penalty: ₹{penalty}"
@@ -137,22 +568,587 @@ class Library:
             return days_late * self.PENALTY_PER_DAY
         return 0
 
-    def get_available_books(self):
-        return [b for b in self.books.values() if b.available]
+    def calculate_penalties(self, as_of=None):
+        """Return {(user_id, book_id): penalty} for every loan that is accruing a penalty on `as_of`."""
+        today = _ordinal(as_of)
+        rate = self.PENALTY_PER_DAY
+        return {(user_id, book_id): (today - due.toordinal()) * rate
+                for due, user_id, book_id in self.list_overdue(today)}
+
+
+# ---------- Library Class ----------
+class Library(BaseLibrary):
+    """In-memory catalog persisted as a JSON snapshot plus an append-only journal."""
+    DATA_FILE = "library_data.json"
+    SNAPSHOT_FILE = "library_data.snap"  # used instead of DATA_FILE when binary=True (converted on open)
+    JOURNAL_FILE = "library_data.journal"
+    COMPACT_THRESHOLD = 1000  # minimum journal records before they are folded into a snapshot
+    SNAPSHOT_SLICE = 10_000  # books encoded per json.dumps call when writing a JSON snapshot
+
+    GROUP_COMMIT_DELAY = 0.05  # seconds a background commit may wait to gather more records
+    GROUP_COMMIT_BATCH = 500
+
+    def __init__(self, journal=True, background=False, binary=False):
+        if background and not journal:
+            raise ValueError("background commits require journal mode")
+        self.books = {}
+        self.borrowers = {}
+        self._available = []  # sorted ids of the available books; a page is a slice of it
+        # The author/title indexes are built on the first search so startup never reads every title
+        self._text_indexed = False
+        self._by_author = {}  # lowercased author -> set of book_ids
+        self._by_token = {}  # lowercased title word -> set of book_ids
+        self._tokens = []  # sorted keys of _by_token, for prefix lookups
+        self._new_tokens = []  # keys of _by_token not yet merged into _tokens
+        self._due = []  # sorted (due ordinal, book_id, user_id) for every outstanding loan
+        self._next_book_id = 1  # ids only ever grow, so they are never reused
+        self._next_user_id = 1
+        self.journal = journal
+        self.binary = binary
+        self._journal_file = None
+        self._journal_records = 0
+        self._writer = None
+        self.load_data()
+        if background:
+            self._writer = JournalWriter(self.JOURNAL_FILE, self.GROUP_COMMIT_DELAY, self.GROUP_COMMIT_BATCH)
+
+    def save_data(self):
+        """Write a full snapshot atomically; in journal mode this also compacts the journal."""
+        if self._writer:
+            self._writer.flush()
+        if self._journal_file:
+            self._journal_file.close()
+            self._journal_file = None
+        self._write_snapshot(*self._snapshot_state())
+        self._journal_records = 0
+
+    def _snapshot_state(self):
+        # A copy later changes cannot disturb, cheap enough to take on the calling thread: a Book's
+        # title and author never change (a replaced book is a new object), availability is taken
+        # from the index rather than from the Books, and borrowers are few
+        borrowers = [Borrower(b.user_id, b.name, dict(b.borrowed_books)) for b in self.borrowers.values()]
+        return self.books.copy(), list(self._available), borrowers
+
+    def _write_snapshot(self, books, available_ids, borrowers, retire=None):
+        # Runs on the writer thread for background compactions, so it only touches its arguments.
+        # `retire` is the other format's file when migrating; see load_data()
+        data_file = self.SNAPSHOT_FILE if self.binary else self.DATA_FILE
+        tmp_file = data_file + ".tmp"
+        if self.binary:
+            write_binary_snapshot(tmp_file, books, borrowers, available_ids)
+        else:
+            available = set(available_ids)
+            books = list(books.values())
+            with open(tmp_file, "w") as f:
+                # json.dumps uses the C encoder (json.dump streams through the pure-Python one), but
+                # holds the GIL throughout, so the books go in slices to let other threads run
+                f.write('{"books":[')
+                for start in range(0, len(books), self.SNAPSHOT_SLICE):
+                    rows = [{"book_id": book.book_id, "title": book.title, "author": book.author,
+                             "available": book.book_id in available}
+                            for book in books[start:start + self.SNAPSHOT_SLICE]]
+                    f.write(("," if start else "") + json.dumps(rows, separators=(",", ":"))[1:-1])
+                f.write('],"borrowers":')
+                f.write(json.dumps([borrower.to_dict() for borrower in borrowers], separators=(",", ":")))
+                f.write("}")
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, data_file)
+        if retire:
+            # Before the truncate below: once the journal is emptied, the old file must not be
+            # found again, or reopening in that format would load it without the journaled changes
+            os.replace(retire, retire + ".migrated")
+        _fsync_dir(data_file)
+
+        if self.journal:
+            # Every journaled record is now part of the snapshot. Replay is idempotent,
+            # so a crash before the truncate below only costs a redundant replay.
+            with open(self.JOURNAL_FILE, "w") as f:
+                os.fsync(f.fileno())
+
+    def load_data(self):
+        # Both formats share the journal, which belongs to whichever file was written last. If
+        # only the other format's file exists, the library has been kept in that format so far:
+        # load it, then convert it and retire the old file so the two never disagree.
+        data_file, other_file = self.DATA_FILE, self.SNAPSHOT_FILE
+        if self.binary:
+            data_file, other_file = other_file, data_file
+        migrate = not os.path.exists(data_file) and os.path.exists(other_file)
+        available_ids = ()
+        try:
+            if self.binary != migrate:
+                self.books, self.borrowers = read_binary_snapshot(other_file if migrate else data_file)
+                available_ids = self.books.available_ids()
+            else:
+                with open(other_file if migrate else data_file, "r") as f:
+                    data = json.load(f)
+                self.books = {b["book_id"]: Book.from_dict(b) for b in data["books"]}
+                self.borrowers = {u["user_id"]: Borrower.from_dict(u) for u in data["borrowers"]}
+                available_ids = (b["book_id"] for b in data["books"] if b["available"])
+        except FileNotFoundError:
+            pass
+        self._rebuild_indexes(available_ids)
+        if self.journal:
+            self.replay_journal()
+        if migrate:
+            self._write_snapshot(*self._snapshot_state(), retire=other_file)
+            self._journal_records = 0
+
+    def replay_journal(self):
+        torn = False
+        try:
+            with open(self.JOURNAL_FILE, "r") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        torn = True  # crashed mid-append; the operation never completed
+                        break
+                    self._apply(json.loads(line))
+                    self._journal_records += 1
+        except FileNotFoundError:
+            return
+        if torn:
+            # Fold what we have into a snapshot so new records don't land after the torn tail
+            self.save_data()
+
+    def flush(self):
+        if self._writer:
+            self._writer.flush()
+
+    def close(self):
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        if self._journal_file:
+            self._journal_file.close()
+            self._journal_file = None
+
+    def _commit(self, record, count=1):
+        if not self.journal:
+            self.save_data()
+            return
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        if self._writer:
+            self._writer.append(line)
+        else:
+            if self._journal_file is None:
+                self._journal_file = open(self.JOURNAL_FILE, "a")
+            self._journal_file.write(line)
+            self._journal_file.flush()
+            os.fsync(self._journal_file.fileno())
+        self._journal_records += count
+        # Scale with the catalog so a snapshot's cost is amortized over as many records
+        if self._journal_records >= max(self.COMPACT_THRESHOLD, len(self.books)):
+            if self._writer:
+                # Serializing and fsyncing happen on the writer thread, queued behind the records
+                # the snapshot covers; this thread (Tk's, in LibraryApp) only pays for the copy
+                state = self._snapshot_state()
+                self._writer.run(lambda: self._write_snapshot(*state))
+                self._journal_records = 0
+            else:
+                self.save_data()
+
+    def _apply(self, record):
+        # Records carry resulting state rather than deltas, so applying one twice is harmless
+        op = record["op"]
+        if op == "books":
+            for data in record["books"]:
+                self._put_book(Book.from_dict(data))
+        elif op == "borrowers":
+            for data in record["borrowers"]:
+                self._put_borrower(Borrower.from_dict(data))
+        elif op == "borrow":
+            self._set_available(self.books[record["book_id"]], False)
+            self._remove_loan(record["user_id"], record["book_id"])
+            self.borrowers[record["user_id"]].borrowed_books[record["book_id"]] = record["due"]
+            self._index_loan(record["user_id"], record["book_id"], record["due"])
+        elif op == "return":
+            self._set_available(self.books[record["book_id"]], True)
+            self._remove_loan(record["user_id"], record["book_id"])
+
+    def _add_book_batch(self, rows):
+        books = []
+        for title, author in rows:
+            book = Book(self._next_book_id, title, author)
+            self._put_book(book)
+            books.append(book.to_dict())
+        self._commit({"op": "books", "books": books}, len(books))
+
+    def _add_borrower_batch(self, names):
+        borrowers = []
+        for name in names:
+            borrower = Borrower(self._next_user_id, name)
+            self._put_borrower(borrower)
+            borrowers.append(borrower.to_dict())
+        self._commit({"op": "borrowers", "borrowers": borrowers}, len(borrowers))
+
+    def get_book(self, book_id):
+        return self.books.get(book_id)
+
+    def get_borrower(self, user_id):
+        return self.borrowers.get(user_id)
+
+    def _lend(self, borrower, book):
+        due = borrower.borrowed_books[book.book_id]
+        self._set_available(book, False)
+        self._index_loan(borrower.user_id, book.book_id, due)
+        self._commit({"op": "borrow", "user_id": borrower.user_id, "book_id": book.book_id, "due": due})
+
+    def _take_back(self, borrower, book):
+        due = self._remove_loan(borrower.user_id, book.book_id)
+        if due:
+            self._set_available(book, True)
+            self._commit({"op": "return", "user_id": borrower.user_id, "book_id": book.book_id})
+        return due
+
+    def list_overdue(self, as_of=None):
+        """Return (due_date, user_id, book_id) for loans due before `as_of` (default today), oldest first."""
+        end = self._overdue_end(as_of)
+        return [(date.fromordinal(due), user_id, book_id) for due, book_id, user_id in self._due[:end]]
+
+    def calculate_penalties(self, as_of=None):
+        # Same result as the base version, computed on ordinals straight off the due-date index
+        today = _ordinal(as_of)
+        end = self._overdue_end(today)
+        rate = self.PENALTY_PER_DAY
+        return {(user_id, book_id): (today - due) * rate for due, book_id, user_id in self._due[:end]}
+
+    def _overdue_end(self, as_of):
+        # Loans are ordered by due date, so the overdue ones are exactly a prefix of _due
+        return bisect_left(self._due, (_ordinal(as_of),))
+
+    def get_available_books(self, offset=0, limit=None):
+        # In id order, like SQLiteLibrary, so a book keeps its page when it is returned
+        stop = None if limit is None else offset + limit
+        return [self.books[book_id] for book_id in self._available[offset:stop]]
+
+    def count_available_books(self):
+        return len(self._available)
+
+    def search(self, title=None, author=None, available_only=False):
+        """Find books whose title words start with the words of `title` and/or by `author`."""
+        if (title or author) and not self._text_indexed:
+            self._build_text_indexes()
+        candidates = []
+        if author:
+            candidates.append(self._by_author.get(author.strip().lower(), set()))
+        if title:
+            words = _title_words(title)
+            if not words:
+                return []
+            candidates.extend(self._prefix_matches(word) for word in words)
+        if not candidates:
+            return self.get_available_books() if available_only else list(self.books.values())
+
+        # Intersect starting from the smallest set so the work tracks the result size; availability
+        # is checked per match, as the available ids can far outnumber them
+        candidates.sort(key=len)
+        matches = set(candidates[0])
+        for ids in candidates[1:]:
+            matches.intersection_update(ids)
+            if not matches:
+                break
+        books = [self.books[book_id] for book_id in sorted(matches)]
+        return [book for book in books if book.available] if available_only else books
+
+    def _prefix_matches(self, prefix):
+        self._merge_new_tokens()
+        matches = set()
+        i = bisect_left(self._tokens, prefix)
+        while i < len(self._tokens) and self._tokens[i].startswith(prefix):
+            matches.update(self._by_token[self._tokens[i]])
+            i += 1
+        return matches
+
+    # --- index maintenance ---
+    def _merge_new_tokens(self):
+        # New words are merged lazily: one sort of two sorted runs is linear, whereas an
+        # insort per new word makes bulk loads quadratic
+        if self._new_tokens:
+            self._tokens.extend(sorted(self._new_tokens))
+            self._tokens.sort()
+            self._new_tokens = []
+
+    def _rebuild_indexes(self, available_ids):
+        self._available = sorted(available_ids)
+        self._text_indexed = False
+        self._by_author = {}
+        self._by_token = {}
+        self._tokens = []
+        self._new_tokens = []
+        self._next_book_id = max(self.books, default=0) + 1
+        self._next_user_id = max(self.borrowers, default=0) + 1
+        self._due = sorted(
+            (_ordinal(due), book_id, borrower.user_id)
+            for borrower in self.borrowers.values()
+            for book_id, due in borrower.borrowed_books.items()
+        )
+
+    def _build_text_indexes(self):
+        self._text_indexed = True
+        for book in self.books.values():
+            self._index_text(book)
+
+    def _put_book(self, book):
+        old = self.books.get(book.book_id)
+        if old is not None:
+            self._unindex_book(old)
+        self.books[book.book_id] = book
+        self._index_book(book)
+        self._next_book_id = max(self._next_book_id, book.book_id + 1)
+
+    def _put_borrower(self, borrower):
+        old = self.borrowers.get(borrower.user_id)
+        if old is not None:
+            for book_id in list(old.borrowed_books):
+                self._remove_loan(old.user_id, book_id)
+        self.borrowers[borrower.user_id] = borrower
+        self._next_user_id = max(self._next_user_id, borrower.user_id + 1)
+        for book_id, due in borrower.borrowed_books.items():
+            self._index_loan(borrower.user_id, book_id, due)
+
+    def _index_loan(self, user_id, book_id, due):
+        insort(self._due, (_ordinal(due), book_id, user_id))
+
+    def _remove_loan(self, user_id, book_id):
+        # Drops the loan from the borrower and the due-date index; returns its due date string
+        borrower = self.borrowers[user_id]
+        due = borrower.return_book(book_id)
+        if due:
+            key = (_ordinal(due), book_id, user_id)
+            i = bisect_left(self._due, key)
+            if i < len(self._due) and self._due[i] == key:
+                del self._due[i]
+        return due
+
+    def _set_available(self, book, available):
+        book.available = available
+        if available:
+            self._add_available(book.book_id)
+        else:
+            self._discard_available(book.book_id)
+
+    def _add_available(self, book_id):
+        ids = self._available
+        if not ids or book_id > ids[-1]:
+            ids.append(book_id)  # new books always have the highest id
+            return
+        i = bisect_left(ids, book_id)
+        if i == len(ids) or ids[i] != book_id:
+            ids.insert(i, book_id)
+
+    def _discard_available(self, book_id):
+        ids = self._available
+        i = bisect_left(ids, book_id)
+        if i < len(ids) and ids[i] == book_id:
+            del ids[i]
+
+    def _index_book(self, book):
+        if book.available:
+            self._add_available(book.book_id)
+        if self._text_indexed:
+            self._index_text(book)
+
+    def _index_text(self, book):
+        self._by_author.setdefault(book.author.strip().lower(), set()).add(book.book_id)
+        for word in _title_words(book.title):
+            ids = self._by_token.get(word)
+            if ids is None:
+                ids = self._by_token[word] = set()
+                self._new_tokens.append(word)
+            ids.add(book.book_id)
+
+    def _unindex_book(self, book):
+        self._discard_available(book.book_id)
+        if not self._text_indexed:
+            return
+        self._merge_new_tokens()
+        _discard_from(self._by_author, book.author.strip().lower(), book.book_id)
+        for word in _title_words(book.title):
+            if _discard_from(self._by_token, word, book.book_id):
+                del self._tokens[bisect_left(self._tokens, word)]
+
+
+# ---------- SQLite Library ----------
+class SQLiteLibrary(BaseLibrary):
+    """Catalog stored in SQLite; nothing is loaded up front and every query uses an index."""
+    DB_FILE = "library_data.db"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS books (
+            book_id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            author TEXT NOT NULL,
+            author_key TEXT NOT NULL,
+            available INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE INDEX IF NOT EXISTS books_available ON books (book_id) WHERE available = 1;
+        CREATE INDEX IF NOT EXISTS books_author ON books (author_key);
+        CREATE TABLE IF NOT EXISTS title_words (
+            word TEXT NOT NULL,
+            book_id INTEGER NOT NULL REFERENCES books,
+            PRIMARY KEY (word, book_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS borrowers (
+            user_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS loans (
+            book_id INTEGER PRIMARY KEY REFERENCES books,
+            user_id INTEGER NOT NULL REFERENCES borrowers,
+            due TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS loans_due ON loans (due);
+        CREATE INDEX IF NOT EXISTS loans_user ON loans (user_id);
+    """
+
+    def __init__(self, db_file=None):
+        import sqlite3
+        # Autocommit mode; _transaction() issues BEGIN/COMMIT itself so reads and writes
+        # of one borrow/return happen in the same transaction.
+        self.conn = sqlite3.connect(db_file or self.DB_FILE, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def close(self):
+        self.conn.close()
+
+    def import_json(self, library=None):
+        """Bulk-copy a JSON library (snapshot + journal in the working directory by default)."""
+        source = library or Library()
+        with self._transaction():
+            self._insert_books(source.books.values())
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO borrowers (user_id, name) VALUES (?, ?)",
+                ((u.user_id, u.name) for u in source.borrowers.values()))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO loans (book_id, user_id, due) VALUES (?, ?, ?)",
+                ((book_id, u.user_id, due)
+                 for u in source.borrowers.values() for book_id, due in u.borrowed_books.items()))
+        if library is None:
+            source.close()
+
+    def _insert_books(self, books):
+        books = list(books)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO books (book_id, title, author, author_key, available) VALUES (?, ?, ?, ?, ?)",
+            ((b.book_id, b.title, b.author, b.author.strip().lower(), int(b.available)) for b in books))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO title_words (word, book_id) VALUES (?, ?)",
+            ((word, b.book_id) for b in books for word in _title_words(b.title)))
+
+    def _add_book_batch(self, rows):
+        with self._transaction():
+            # Ids continue from the current maximum, allocated inside the write transaction
+            next_id = self.conn.execute("SELECT COALESCE(MAX(book_id), 0) + 1 FROM books").fetchone()[0]
+            self._insert_books(Book(next_id + i, title, author) for i, (title, author) in enumerate(rows))
+
+    def _add_borrower_batch(self, names):
+        with self._transaction():
+            self.conn.executemany("INSERT INTO borrowers (name) VALUES (?)", ((name,) for name in names))
+
+    def get_book(self, book_id):
+        row = self.conn.execute(
+            "SELECT book_id, title, author, available FROM books WHERE book_id = ?", (book_id,)).fetchone()
+        return Book(row[0], row[1], row[2], bool(row[3])) if row else None
+
+    def get_borrower(self, user_id):
+        row = self.conn.execute("SELECT name FROM borrowers WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+        loans = self.conn.execute("SELECT book_id, due FROM loans WHERE user_id = ?", (user_id,))
+        return Borrower(user_id, row[0], dict(loans))
+
+    def borrow_book(self, user_id, book_id):
+        with self._transaction():
+            return super().borrow_book(user_id, book_id)
+
+    def return_book(self, user_id, book_id):
+        with self._transaction():
+            return super().return_book(user_id, book_id)
+
+    def _lend(self, borrower, book):
+        self.conn.execute("UPDATE books SET available = 0 WHERE book_id = ?", (book.book_id,))
+        self.conn.execute("INSERT INTO loans (book_id, user_id, due) VALUES (?, ?, ?)",
+                          (book.book_id, borrower.user_id, borrower.borrowed_books[book.book_id]))
+
+    def _take_back(self, borrower, book):
+        due = borrower.return_book(book.book_id)
+        if due:
+            self.conn.execute("DELETE FROM loans WHERE book_id = ?", (book.book_id,))
+            self.conn.execute("UPDATE books SET available = 1 WHERE book_id = ?", (book.book_id,))
+        return due
+
+    def get_available_books(self, offset=0, limit=None):
+        rows = self.conn.execute(
+            "SELECT book_id, title, author FROM books WHERE available = 1 ORDER BY book_id LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset))
+        return [Book(book_id, title, author) for book_id, title, author in rows]
+
+    def count_available_books(self):
+        return self.conn.execute("SELECT COUNT(*) FROM books WHERE available = 1").fetchone()[0]
+
+    def search(self, title=None, author=None, available_only=False):
+        clauses, params = [], []
+        if author:
+            clauses.append("author_key = ?")
+            params.append(author.strip().lower())
+        if title:
+            words = _title_words(title)
+            if not words:
+                return []
+            for word in words:
+                # Prefix match as a range scan over the title_words primary key
+                clauses.append("book_id IN (SELECT book_id FROM title_words WHERE word >= ? AND word < ?)")
+                params.extend((word, word + "\U0010ffff"))
+        if available_only:
+            clauses.append("available = 1")
+        where = " AND ".join(clauses) or "1"
+        rows = self.conn.execute(
+            f"SELECT book_id, title, author, available FROM books WHERE {where} ORDER BY book_id", params)
+        return [Book(book_id, title, author, bool(available)) for book_id, title, author, available in rows]
+
+    def list_overdue(self, as_of=None):
+        """Return (due_date, user_id, book_id) for loans due before `as_of` (default today), oldest first."""
+        as_of = date.fromordinal(_ordinal(as_of)).isoformat()
+        rows = self.conn.execute(
+            "SELECT due, user_id, book_id FROM loans WHERE due < ? ORDER BY due, book_id", (as_of,))
+        return [(date.fromisoformat(due), user_id, book_id) for due, user_id, book_id in rows]
 
 
 # ---------- GUI Class ----------
 class LibraryApp:
-    def __init__(self, root):
-        self.library = Library()
+    PAGE_SIZE = 50  # rows materialized in the table at once
+
+    def __init__(self, root, library=None):
+        _load_tk()
+        # By default saves happen on a writer thread so a slow disk never blocks the event loop
+        self.library = library or Library(background=True)
+        self.page = 0
+        self.shown = {}  # Treeview iid -> row values currently displayed
         self.root = root
         self.root.title("📚 Library Management System")
         self.root.geometry("800x600")
         self.root.config(bg="#f5f5f5")
 
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         self.setup_ui()
         self.refresh_books()
 
+    def on_close(self):
+        self.library.close()  # flushes pending journal records
+        self.root.destroy()
+
     def setup_ui(self):
         tk.Label(self.root, text="Library Management System", font=("Arial", 20, "bold"), bg="#f5f5f5").pack(pady=10)
 
@@ -193,14 +1189,44 @@ class LibraryApp:
         self.tree.heading("ID", text="Book ID")
         self.tree.heading("Title", text="Title")
         self.tree.heading("Author", text="Author")
+
+        # --- Paging (packed first so it stays visible below the table) ---
+        nav = tk.Frame(self.root, bg="#f5f5f5")
+        nav.pack(side=tk.BOTTOM, pady=10)
+        tk.Button(nav, text="< Prev", command=lambda: self.change_page(-1)).pack(side=tk.LEFT)
+        self.page_label = tk.Label(nav, bg="#f5f5f5", width=20)
+        self.page_label.pack(side=tk.LEFT)
+        tk.Button(nav, text="Next >", command=lambda: self.change_page(1)).pack(side=tk.LEFT)
+
         self.tree.pack(pady=20, fill=tk.BOTH, expand=True)
 
+    def change_page(self, step):
+        self.page += step
+        self.refresh_books()
+
     def refresh_books(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+        total = self.library.count_available_books()
+        pages = max(1, -(-total // self.PAGE_SIZE))
+        self.page = min(max(self.page, 0), pages - 1)
+        self.page_label.config(text=f"Page {self.page + 1} of {pages}")
+
+        # Only the visible page is materialized, and only rows that changed touch the widget
+        books = self.library.get_available_books(self.page * self.PAGE_SIZE, self.PAGE_SIZE)
+        wanted = {str(book.book_id): (book.book_id, book.title, book.author) for book in books}
+
+        for iid in [iid for iid in self.shown if iid not in wanted]:
+            self.tree.delete(iid)
+            del self.shown[iid]
 
-        for book in self.library.get_available_books():
-            self.tree.insert("", tk.END, values=(book.book_id, book.title, book.author))
+        for index, (iid, values) in enumerate(wanted.items()):
+            if iid not in self.shown:
+                self.tree.insert("", index, iid=iid, values=values)
+            else:
+                if self.shown[iid] != values:
+                    self.tree.item(iid, values=values)
+                if self.tree.index(iid) != index:
+                    self.tree.move(iid, "", index)
+            self.shown[iid] = values
 
     def add_book(self):
         title = self.book_title.get().strip()
@@ -246,6 +1272,23 @@ class LibraryApp:
 
 # ---------- Run App ----------
 if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "convert":
+        # python ls.py convert library_data.json library_data.snap (or the other way round)
+        convert_snapshot(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    if len(sys.argv) == 4 and sys.argv[1] == "import":
+        # python ls.py import books|borrowers file.csv
+        library = Library()
+        result = library.import_csv(sys.argv[3], kind=sys.argv[2])
+        library.close()
+        print(f"Added {result['added']} {sys.argv[2]}, rejected {len(result['rejected'])} "
+              f"in {result['seconds']:.2f}s ({result['rows_per_sec']:.0f} rows/sec)")
+        for row_no, row, reason in result["rejected"][:20]:
+            print(f" - row {row_no}: {reason}")
+        sys.exit(0)
+
+    _load_tk()
     root = tk.Tk()
     app = LibraryApp(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,183 @@
+# Benchmarks for the library system in ls.py
+# Builds synthetic catalogs, times the main Library operations and writes the results as JSON.
+#
+#   python ls_bench.py                                  # 10k and 100k books, JSON backend
+#   python ls_bench.py --sizes 1000000 --backend binary --output before.json
+#
+# Each catalog size runs in a fresh process so the peak memory reported is its own.
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from ls import Book, Borrower, Library, SQLiteLibrary, write_binary_snapshot
+
+WORDS = ["river", "night", "garden", "shadow", "city", "winter", "glass", "storm", "letter", "empire",
+         "silent", "golden", "last", "secret", "broken", "house", "song", "road", "fire", "sea"]
+
+
+def make_catalog(size, borrower_ratio, loan_ratio, seed):
+    rng = random.Random(seed)
+    books = [Book(i, f"The {rng.choice(WORDS)} {rng.choice(WORDS)} {i}", f"Author {rng.randrange(size // 20 + 1)}")
+             for i in range(1, size + 1)]
+    borrowers = [Borrower(i, f"Borrower {i}") for i in range(1, max(1, int(size * borrower_ratio)) + 1)]
+    today = date.today()
+    for book in rng.sample(books, int(size * loan_ratio)):
+        # Roughly a third of the loans are overdue
+        due = today + timedelta(days=rng.randint(-30, 60))
+        book.available = False
+        rng.choice(borrowers).borrowed_books[book.book_id] = due.isoformat()
+    return books, borrowers
+
+
+def open_library(backend):
+    if backend == "sqlite":
+        return SQLiteLibrary()
+    return Library(binary=backend == "binary")
+
+
+def write_catalog(backend, books, borrowers):
+    if backend == "binary":
+        write_binary_snapshot(Library.SNAPSHOT_FILE, books, borrowers)
+        return
+    data = {"books": [b.to_dict() for b in books], "borrowers": [u.to_dict() for u in borrowers]}
+    with open(Library.DATA_FILE, "w") as f:
+        f.write(json.dumps(data, separators=(",", ":")))
+    if backend == "sqlite":
+        library = SQLiteLibrary()
+        library.import_json()
+        library.close()
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples):
+    samples = sorted(samples)
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000
+
+    return {"runs": len(samples), "p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99),
+            "max_ms": samples[-1] * 1000, "mean_ms": sum(samples) / len(samples) * 1000}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_size(size, args):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        books, borrowers = make_catalog(size, args.borrower_ratio, args.loan_ratio, args.seed)
+        write_catalog(args.backend, books, borrowers)
+        user_ids = [u.user_id for u in borrowers]
+        available_ids = [b.book_id for b in books if b.available]
+        loans = sum(len(u.borrowed_books) for u in borrowers)
+        del books, borrowers
+
+        libraries = []
+
+        def load():
+            libraries.append(open_library(args.backend))
+
+        ops = {"load_data": timed(load, args.repeat)}
+        for library in libraries[:-1]:
+            library.close()
+        library = libraries[-1]
+        ops["save_data"] = timed(library.save_data, args.repeat)
+
+        ops["add_book"] = timed(lambda: library.add_book("Benchmark title", "Benchmark author"), args.ops)
+
+        picked = iter(rng.sample(available_ids, min(args.ops, len(available_ids))))
+        pairs = []
+
+        def borrow():
+            pair = (rng.choice(user_ids), next(picked))
+            library.borrow_book(*pair)
+            pairs.append(pair)
+
+        ops["borrow_book"] = timed(borrow, min(args.ops, len(available_ids)))
+        returns = iter(pairs)
+        ops["return_book"] = timed(lambda: library.return_book(*next(returns)), len(pairs))
+
+        ops["get_available_books"] = timed(library.get_available_books, args.repeat)
+        ops["get_available_books_page"] = timed(lambda: library.get_available_books(0, 50), args.ops)
+
+        due_dates = [datetime.now() - timedelta(days=rng.randint(-30, 30)) for _ in range(args.ops)]
+        due_iter = iter(due_dates)
+        ops["calculate_penalty"] = timed(lambda: library.calculate_penalty(next(due_iter)), len(due_dates))
+        ops["calculate_penalties"] = timed(library.calculate_penalties, args.repeat)
+
+        library.close()
+        os.chdir(args.start_dir)
+
+    return {
+        "backend": args.backend,
+        "books": size,
+        "borrowers": len(user_ids),
+        "loans": loans,
+        "ops": {name: summarize(samples) for name, samples in ops.items()},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Library operations at catalog scale.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000],
+                        help="catalog sizes to generate (e.g. 10000 100000 1000000)")
+    parser.add_argument("--backend", choices=["json", "binary", "sqlite"], default="json")
+    parser.add_argument("--borrower-ratio", type=float, default=0.05, help="borrowers per book")
+    parser.add_argument("--loan-ratio", type=float, default=0.1, help="fraction of books on loan")
+    parser.add_argument("--ops", type=int, default=200, help="samples for per-operation timings")
+    parser.add_argument("--repeat", type=int, default=3, help="samples for whole-catalog operations")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+    args.start_dir = os.getcwd()
+
+    results = []
+    for size in args.sizes:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(run_size, size, args).result()
+        results.append(result)
+        rss = result["peak_rss_mb"]
+        print(f"\n{args.backend} backend, {size} books, peak RSS {'n/a' if rss is None else f'{rss:.0f} MB'}",
+              file=sys.stderr)
+        for name, stats in result["ops"].items():
+            print(f"  {name:<26} p50 {stats['p50_ms']:9.3f} ms   p95 {stats['p95_ms']:9.3f} ms   "
+                  f"p99 {stats['p99_ms']:9.3f} ms", file=sys.stderr)
+
+    report = {"python": sys.version.split()[0], "platform": sys.platform,
+              "timestamp": datetime.now().isoformat(timespec="seconds"), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()